@@ -3,6 +3,20 @@ ASGI config for ai_career_counselor project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving it routes results, results_status, dashboard and
+api_career_suggestions to their async variants (COUNSELOR_ASYNC_VIEWS,
+set here unless ASYNC_VIEWS is given), which wait on the database and
+the inference executor without holding a worker thread each. Launch profile, e.g. on Render:
+
+    gunicorn ai_career_counselor.asgi:application \
+        -k uvicorn.workers.UvicornWorker --workers 3 --bind 0.0.0.0:$PORT
+
+One event loop per worker process; inference runs on a bounded thread
+pool sized by COUNSELOR_INFERENCE_THREADS / COUNSELOR_INFERENCE_QUEUE,
+and sync views and middleware (WhiteNoise among them) still run in
+threads. The WSGI entry point remains the default and serves the sync
+views.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -12,5 +26,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_career_counselor.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
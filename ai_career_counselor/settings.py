@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 import dj_database_url
 
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
 
 # --- MIDDLEWARE ---
 MIDDLEWARE = [
+    'counselor.middleware.ServerTimingMiddleware',  # First, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Must be right after SecurityMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -30,6 +32,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'counselor.middleware.RuleSetReloadMiddleware',
 ]
 
 # --- URL / WSGI ---
@@ -66,5 +69,46 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# --- CACHE ---
+# File-based so every worker on the host sees the same rendered results
+# pages and invalidations; point this at Redis/Memcached when scaling out
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'DJANGO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai_career_counselor_cache')
+        ),
+    }
+}
+COUNSELOR_RESULTS_CACHE_TIMEOUT = int(os.environ.get('RESULTS_CACHE_TIMEOUT', 3600))
+
+# --- AI ENGINE ---
+# In-process LRU/TTL cache in front of the inference pipeline
+COUNSELOR_INFERENCE_CACHE = {
+    'MAXSIZE': int(os.environ.get('INFERENCE_CACHE_SIZE', 1024)),
+    'TTL': int(os.environ.get('INFERENCE_CACHE_TTL', 300)),
+}
+# Seconds between checks for a newly published rule set (load_ruleset)
+COUNSELOR_RULESET_CHECK_INTERVAL = float(os.environ.get('RULESET_CHECK_INTERVAL', 5))
+# Score submitted assessments on a local worker pool (counselor.jobs)
+# instead of in the request; the results page polls until they are ready
+COUNSELOR_ASYNC_ASSESSMENTS = os.environ.get('ASYNC_ASSESSMENTS', 'False') == 'True'
+# Worker threads per process; 0 leaves the queue to process_inference_jobs
+COUNSELOR_JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+COUNSELOR_JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 2))
+# Seconds before a running job is considered abandoned and re-queued
+COUNSELOR_JOB_TIMEOUT = int(os.environ.get('JOB_TIMEOUT', 300))
+# Route results, dashboard and the suggestions API to their async variants;
+# the ASGI entry point turns this on, WSGI keeps the sync views
+COUNSELOR_ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+# Threads running inference for the async views, and how many more calls
+# may wait for one before the API answers 503 (counselor.async_utils)
+COUNSELOR_INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', 4))
+COUNSELOR_INFERENCE_QUEUE = int(os.environ.get('INFERENCE_QUEUE', 32))
+# Send per-phase durations in a Server-Timing header (they reveal server
+# internals, so off in production unless asked for); the in-process
+# histograms behind api/timings/ are always kept
+COUNSELOR_SERVER_TIMING = os.environ.get('SERVER_TIMING', str(DEBUG)) == 'True'
+
 # --- OTHER SETTINGS ---
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
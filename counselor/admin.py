@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Subject, Career, StudentAssessment, CareerRecommendation
+from .models import Subject, Career, StudentAssessment, CareerRecommendation, RuleSet, InferenceJob
 
 @admin.register(Subject)
 class SubjectAdmin(admin.ModelAdmin):
@@ -38,4 +38,27 @@ class CareerRecommendationAdmin(admin.ModelAdmin):
     
     def get_career_name(self, obj):
         return obj.career.name if obj.career else "Custom Career"
-    get_career_name.short_description = 'Career'
\ No newline at end of file
+    get_career_name.short_description = 'Career'
+
+@admin.register(RuleSet)
+class RuleSetAdmin(admin.ModelAdmin):
+    # Versions are immutable; publish new ones with the load_ruleset command
+    list_display = ['version', 'comment', 'created_at']
+    search_fields = ['comment']
+    readonly_fields = ['version', 'state', 'created_at']
+    ordering = ['-version']
+    
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(InferenceJob)
+class InferenceJobAdmin(admin.ModelAdmin):
+    # Rows are the queue of counselor.jobs; set status back to pending to retry
+    list_display = ['assessment', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['assessment__name', 'assessment__session_id']
+    readonly_fields = ['assessment', 'attempts', 'error', 'created_at', 'started_at', 'finished_at']
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request):
+        return False
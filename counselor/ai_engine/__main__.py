@@ -0,0 +1,235 @@
+"""
+Command-line scorer, independent of Django:
+
+    python -m counselor.ai_engine score students.csv -o results.ndjson
+    python -m counselor.ai_engine bench-unify --facts 100 1000 10000
+
+Rows are read from a CSV file (or NDJSON with a .ndjson/.jsonl name, or
+``-`` for stdin) and one NDJSON result line is written per row as soon as
+it is scored. CSV columns named after a subject (``mathematics`` or
+``score_mathematics``) are scores; ``career_interests`` is a
+``;``-separated list; ``id`` is copied to the output.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+from .career_engine import CareerInferenceEngine
+
+
+def _open_input(path):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def _open_output(path):
+    if path == '-':
+        return sys.stdout
+    return open(path, 'w', encoding='utf-8')
+
+
+def _is_ndjson(path):
+    return path.endswith(('.ndjson', '.jsonl'))
+
+
+def _csv_student(row, subjects):
+    """(id, student_data) for one CSV row"""
+    subject_scores = {}
+    for column, value in row.items():
+        if column is None or value is None or not value.strip():
+            continue
+        subject = column[len('score_'):] if column.startswith('score_') else column
+        if subject in subjects:
+            try:
+                subject_scores[subject] = float(value)
+            except ValueError:
+                raise ValueError(f"Score for {subject} must be a number")
+
+    student_data = {
+        'subject_scores': subject_scores,
+        'personality_traits': {},
+        'career_interests': [i.strip() for i in (row.get('career_interests') or '').split(';') if i.strip()],
+    }
+    for field in ('age', 'education_level'):
+        if row.get(field):
+            student_data[field] = row[field]
+    return row.get('id'), student_data
+
+
+def _json_student(line):
+    """(id, student_data) for one NDJSON line, in the web batch API format"""
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("Each student must be a JSON object")
+    subject_scores = data.get('subject_scores', {})
+    if not isinstance(subject_scores, dict):
+        raise ValueError("subject_scores must be an object")
+    for subject, score in subject_scores.items():
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            raise ValueError(f"Score for {subject} must be a number")
+    return data.get('id'), {
+        'subject_scores': subject_scores,
+        'personality_traits': data.get('personality_traits', {}),
+        'career_interests': data.get('career_interests', []),
+    }
+
+
+def iter_students(stream, ndjson, subjects):
+    """Yield (id, student_data, error) per input row, lazily"""
+    if ndjson:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield (*_json_student(line), None)
+            except ValueError as e:
+                yield None, None, str(e)
+        return
+
+    for row in csv.DictReader(stream):
+        try:
+            yield (*_csv_student(row, subjects), None)
+        except ValueError as e:
+            yield row.get('id'), None, str(e)
+
+
+def _result_line(index, student_id, recommendations, error, top):
+    result = {'index': index}
+    if student_id is not None:
+        result['id'] = student_id
+    if error is None:
+        result['success'] = True
+        result['recommendations'] = recommendations[:top]
+    else:
+        result['success'] = False
+        result['error'] = error
+    return json.dumps(result, separators=(',', ':')) + '\n'
+
+
+def score(args):
+    engine = CareerInferenceEngine()
+    subjects = set(engine.kb.subjects_data)
+    top = args.top
+
+    with _open_input(args.input) as source:
+        out = _open_output(args.output)
+        try:
+            students = iter_students(source, _is_ndjson(args.input), subjects)
+            if args.chunk_size <= 1:
+                # Scalar path: no NumPy import, one row in, one line out
+                for index, (student_id, student_data, error) in enumerate(students):
+                    recommendations = None
+                    if error is None:
+                        recommendations = engine.recommend(student_data, use_cache=False)
+                    out.write(_result_line(index, student_id, recommendations, error, top))
+            else:
+                _score_chunked(engine, students, out, args.chunk_size, top)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+            else:
+                out.flush()
+
+
+def _score_chunked(engine, students, out, chunk_size, top):
+    """Vectorised path: score chunk_size rows at a time with the NumPy batch scorer"""
+    chunk = []
+
+    def flush():
+        valid = [student_data for _, _, student_data, error in chunk if error is None]
+        results = iter(engine.recommend_batch(valid, top) if valid else [])
+        for index, student_id, _, error in chunk:
+            out.write(_result_line(index, student_id, next(results) if error is None else None, error, top))
+        chunk.clear()
+
+    for index, (student_id, student_data, error) in enumerate(students):
+        chunk.append((index, student_id, student_data, error))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+
+def bench_unify(args):
+    """
+    Time one rule with variables, high_score(?S) ∧ related(?S, ?C) ∧
+    ¬excluded(?C) ⇒ suitable_career(?C), against growing fact stores, with
+    the (name, first argument) index and with a plain scan for comparison
+    """
+    from .fopl_rules import Predicate
+    from .unification import FactStore, solve
+
+    class ScanStore(FactStore):
+        def candidates(self, name, first=None):
+            return (args for fact_name, args in self._facts if fact_name == name)
+
+    conditions = [
+        Predicate('high_score', ['?S']),
+        Predicate('related', ['?S', '?C']),
+        Predicate('excluded', ['?C'], negated=True),
+    ]
+    print(f"{'facts':>8} {'matches':>8} {'indexed ms':>11} {'scan ms':>9}")
+    for size in args.facts:
+        # Per student: 10% high_score facts, the rest related(S, C) pairs
+        subjects = max(size // 10, 1)
+        stores = []
+        for store in (FactStore(), ScanStore()):
+            for i in range(subjects):
+                store.add('high_score', (f's{i}',))
+            for i in range(size - subjects):
+                store.add('related', (f's{i % (subjects * 4)}', f'c{i}'))
+                if i % 7 == 0:
+                    store.add('excluded', (f'c{i}',))
+            stores.append(store)
+
+        timings = []
+        for store in stores:
+            if store is stores[1] and size > args.scan_limit:
+                timings.append(None)
+                continue
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                matches = sum(1 for _ in solve(conditions, store))
+            timings.append((time.perf_counter() - started) * 1000 / args.repeat)
+        scan = f"{timings[1]:9.2f}" if timings[1] is not None else f"{'skipped':>9}"
+        print(f"{len(stores[0]):>8} {matches:>8} {timings[0]:11.2f} {scan}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m counselor.ai_engine')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = commands.add_parser('score', help='Score students from a CSV or NDJSON file')
+    score_parser.add_argument('input', help="Input file (.csv, .ndjson/.jsonl) or '-' for CSV on stdin")
+    score_parser.add_argument('-o', '--output', default='-', help="NDJSON output file (default: stdout)")
+    score_parser.add_argument('--top', type=int, default=5, help='Recommendations kept per student')
+    score_parser.add_argument(
+        '--chunk-size', type=int, default=1,
+        help='Rows scored together with the NumPy batch scorer; 1 keeps the scalar path (no NumPy)'
+    )
+    score_parser.set_defaults(handler=score)
+
+    bench_parser = commands.add_parser('bench-unify', help='Benchmark rule matching by unification')
+    bench_parser.add_argument('--facts', type=int, nargs='+', default=[100, 1000, 10000],
+                              help='Fact store sizes (facts per student)')
+    bench_parser.add_argument('--repeat', type=int, default=5, help='Runs averaged per size')
+    bench_parser.add_argument('--scan-limit', type=int, default=10000,
+                              help='Largest size also timed with an unindexed scan')
+    bench_parser.set_defaults(handler=bench_unify)
+
+    args = parser.parse_args(argv)
+    try:
+        args.handler(args)
+    except BrokenPipeError:
+        # Output piped into e.g. head
+        sys.stderr.close()
+    except OSError as e:
+        parser.exit(1, f"{parser.prog}: {e}\n")
+
+
+if __name__ == '__main__':
+    main()
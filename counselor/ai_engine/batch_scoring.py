@@ -0,0 +1,281 @@
+import numpy as np
+
+from .inference_engine import MIN_RECOMMENDATION_SCORE, TOP_K, confidence_percent
+from .uncertainty_engine import UNCERTAINTY_LEVELS
+
+
+class BatchScorer:
+    """
+    Vectorised (students x careers) scoring for a ForwardChainingEngine.
+
+    Produces exactly the same career scores and rankings as the scalar
+    infer_careers() path: sums are accumulated in the same order with the
+    same float64 operations, and ties are broken by the order in which the
+    scalar engine would have inserted careers into its score table.
+    Only ground rules are vectorised; rules with variables need the
+    scalar engine (see CareerInferenceEngine.infer_careers_batch).
+    """
+
+    def __init__(self, inference_engine):
+        self.engine = inference_engine
+        rules = inference_engine.rules
+
+        # Columns: every subject the engine can look at, in a fixed order
+        subjects = list(inference_engine.kb.subjects_data)
+        referenced = [s for _, info in inference_engine.careers for s in info.get('required_subjects', [])]
+        referenced += [s for _, info in inference_engine.careers for s in info.get('preferred_subjects', [])]
+        referenced += [s for _, related in inference_engine.trait_map for s in related]
+        referenced += [c.args[0] for rule in rules for c in rule.conditions
+                       if c.name in ('high_score', 'good_score') and c.args]
+        for subject in referenced:
+            if subject not in subjects:
+                subjects.append(subject)
+        self.subjects = tuple(subjects)
+        self.subject_index = {subject: i for i, subject in enumerate(self.subjects)}
+
+        # Career columns: knowledge base careers, then careers only named by rules
+        careers = [key for key, _ in inference_engine.careers]
+        for rule in rules:
+            if rule.conclusion.args and rule.conclusion.args[0] not in careers:
+                careers.append(rule.conclusion.args[0])
+        self.careers = tuple(careers)
+        self.career_index = {career: i for i, career in enumerate(self.careers)}
+
+        self.traits = tuple(trait for trait, _ in inference_engine.trait_map)
+        self.trait_index = {trait: i for i, trait in enumerate(self.traits)}
+        self._trait_columns = [
+            [self.subject_index[s] for s in related] for _, related in inference_engine.trait_map
+        ]
+
+        self._career_columns = []
+        for key, info in inference_engine.careers:
+            self._career_columns.append((
+                self.career_index[key],
+                [self.subject_index[s] for s in info.get('required_subjects', [])],
+                [self.subject_index[s] for s in info.get('preferred_subjects', [])],
+                info.get('min_threshold', 60),
+            ))
+
+        # Required subject counts per career column (uncertainty data penalty)
+        careers_data = inference_engine.kb.careers_data
+        self._required_counts = np.array(
+            [len(careers_data.get(career, {}).get('required_subjects', [])) for career in self.careers],
+            dtype=np.int64
+        )
+
+        self._rules = [
+            (rule, self.career_index[rule.conclusion.args[0]])
+            for rule in rules if rule.conclusion.args and rule.conclusion.args[0]
+        ]
+
+    def subject_matrix(self, students):
+        """
+        Build the (N x S) float64 score array for ``student_data`` dicts;
+        subjects a student did not provide are NaN
+        """
+        scores = np.full((len(students), len(self.subjects)), np.nan)
+        subject_index = self.subject_index
+        for row, student_data in enumerate(students):
+            for subject, score in student_data.get('subject_scores', {}).items():
+                col = subject_index.get(subject)
+                if col is not None:
+                    scores[row, col] = score
+        return scores
+
+    def match_scores(self, scores):
+        """
+        Direct subject matching for every student and career, (N x C).
+        Vectorised equivalent of _calculate_career_match_score.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        result = np.zeros((scores.shape[0], len(self.careers)))
+
+        for career_col, required, preferred, min_threshold in self._career_columns:
+            if not required:
+                continue
+
+            ok = np.ones(scores.shape[0], dtype=bool)
+            required_score = np.zeros(scores.shape[0])
+            for col in required:
+                # NaN (missing) compares False, same as a failing subject
+                ok &= scores[:, col] >= min_threshold
+                required_score += scores[:, col]
+            avg_required = required_score / len(required)
+
+            preferred_bonus = np.zeros(scores.shape[0])
+            for col in preferred:
+                column = scores[:, col]
+                preferred_bonus += np.where(np.isnan(column), 0.0, np.minimum(column * 0.1, 10))
+
+            final_score = np.minimum((avg_required + preferred_bonus) / 100, 1.0)
+            result[:, career_col] = np.where(ok, final_score, 0.0)
+
+        return result
+
+    def trait_matrix(self, scores):
+        """Inferred personality traits, (N x T) bool"""
+        traits = np.zeros((scores.shape[0], len(self.traits)), dtype=bool)
+        for trait_col, columns in enumerate(self._trait_columns):
+            trait_score = np.zeros(scores.shape[0])
+            relevant = np.zeros(scores.shape[0], dtype=np.int64)
+            for col in columns:
+                present = ~np.isnan(scores[:, col])
+                trait_score += np.where(present, scores[:, col], 0.0)
+                relevant += present
+            with np.errstate(invalid='ignore', divide='ignore'):
+                traits[:, trait_col] = (relevant > 0) & (trait_score / relevant > 70)
+        return traits
+
+    def _condition(self, predicate, scores, traits, career_facts):
+        """Vectorised equivalent of a condition's FactLayout bit (working_memory)"""
+        arg = predicate.args[0] if predicate.args else None
+        if predicate.name in ('high_score', 'good_score'):
+            col = self.subject_index.get(arg)
+            if col is None:
+                return None
+            return scores[:, col] >= (75 if predicate.name == 'high_score' else 65)
+        elif predicate.name == 'personality_trait':
+            col = self.trait_index.get(arg)
+            return None if col is None else traits[:, col]
+        elif predicate.name == 'suitable_career':
+            col = self.career_index.get(arg)
+            return None if col is None else career_facts[:, col]
+        return None
+
+    def rule_scores(self, scores, traits, max_iterations=10):
+        """
+        Forward-chain the FOPL rules for every student.
+
+        Returns the (N x C) rule score matrix and the (N x C) insertion
+        order of each career fired by a rule (-1 where no rule fired).
+        """
+        n = scores.shape[0]
+        result = np.zeros((n, len(self.careers)))
+        first_fired = np.full((n, len(self.careers)), -1, dtype=np.int64)
+        career_facts = np.zeros((n, len(self.careers)), dtype=bool)
+
+        for iteration in range(max_iterations):
+            fired_this_pass = np.zeros_like(career_facts)
+            for rule_index, (rule, career_col) in enumerate(self._rules):
+                total = len(rule.conditions)
+                if total == 0:
+                    continue
+                satisfied = np.zeros(n, dtype=np.int64)
+                for condition in rule.conditions:
+                    column = self._condition(condition, scores, traits, career_facts)
+                    if column is not None:
+                        satisfied += column
+                satisfaction = satisfied / total
+                fired = satisfaction > 0.5
+
+                new_score = satisfaction * rule.confidence
+                result[:, career_col] = np.where(fired, np.maximum(result[:, career_col], new_score),
+                                                 result[:, career_col])
+                newly = fired & (first_fired[:, career_col] < 0)
+                first_fired[:, career_col] = np.where(newly, iteration * len(self._rules) + rule_index,
+                                                      first_fired[:, career_col])
+                fired_this_pass[:, career_col] |= fired
+
+            # Stop once no pass derives a career fact that was not known yet
+            new_facts = fired_this_pass & ~career_facts
+            if not new_facts.any():
+                break
+            career_facts |= fired_this_pass
+
+        return result, first_fired
+
+    def career_scores(self, scores):
+        """
+        Combined rule and direct-match scores, (N x C), plus the tie-break
+        key reproducing the scalar engine's insertion order
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        traits = self.trait_matrix(scores)
+        rule_result, first_fired = self.rule_scores(scores, traits)
+        direct = self.match_scores(scores)
+
+        combined = np.maximum(rule_result, direct)
+        # Rule-fired careers come first (in firing order), then direct
+        # matches in knowledge base order
+        offset = first_fired.max(initial=0) + 1
+        order = np.where(first_fired >= 0, first_fired, offset + np.arange(len(self.careers)))
+        return combined, order
+
+    def top_k(self, scores, k=TOP_K):
+        """
+        Top-k careers per student: (N x k) career column indices and
+        scores, ranked exactly as _generate_recommendations does
+        """
+        combined, order = self.career_scores(scores)
+        k = min(k, combined.shape[1])
+        ranking = np.lexsort((order, -combined), axis=-1)[:, :k]
+        return ranking, np.take_along_axis(combined, ranking, axis=1)
+
+    def infer_careers(self, students, k=TOP_K):
+        """
+        Batch equivalent of ForwardChainingEngine.infer_careers: one
+        recommendation list per ``student_data`` dict
+        """
+        ranking, top_scores = self.top_k(self.subject_matrix(students), k)
+        results = []
+        for student_data, columns, values in zip(students, ranking.tolist(), top_scores.tolist()):
+            recommendations = []
+            for i, (col, score) in enumerate(zip(columns, values)):
+                if score > MIN_RECOMMENDATION_SCORE:
+                    recommendations.append(
+                        self.engine._build_recommendation(self.careers[col], score, i + 1, student_data)
+                    )
+            results.append(recommendations)
+        return results
+
+    def adjusted_top_k(self, scores, uncertainty_engine, k=TOP_K):
+        """
+        Top-k careers per student after the uncertainty adjustment, in the
+        order apply_uncertainty_to_recommendations returns them. Structured
+        (N x k) array with fields career (column in self.careers), score
+        (before adjustment), rank (before adjustment), confidence_score,
+        uncertainty_level (index into UNCERTAINTY_LEVELS) and valid, False
+        for careers at or below MIN_RECOMMENDATION_SCORE, which sort last.
+        """
+        ranking, top_scores = self.top_k(scores, k)
+        # Python round() per element: np.round rounds half-way values
+        # differently and would disagree with the scalar path
+        base = np.array(
+            [[confidence_percent(score) for score in row] for row in top_scores.tolist()], dtype=np.float64
+        ).reshape(top_scores.shape)
+        adjusted = uncertainty_engine.adjust_batch(base, self._required_counts[ranking])
+        valid = top_scores > MIN_RECOMMENDATION_SCORE
+        ranks = np.broadcast_to(np.arange(1, ranking.shape[1] + 1), ranking.shape)
+
+        # Stable sort on the adjusted score, like sorted() in the scalar path
+        order = np.lexsort((ranks, -adjusted['confidence_score'], ~valid), axis=-1)
+
+        result = np.empty(ranking.shape, dtype=[
+            ('career', np.int64), ('score', np.float64), ('rank', np.int64),
+            ('confidence_score', np.int64), ('uncertainty_level', np.uint8), ('valid', bool),
+        ])
+        for field, values in (
+            ('career', ranking), ('score', top_scores), ('rank', ranks),
+            ('confidence_score', adjusted['confidence_score']),
+            ('uncertainty_level', adjusted['uncertainty_level']), ('valid', valid),
+        ):
+            result[field] = np.take_along_axis(values, order, axis=1)
+        return result
+
+    def recommend(self, students, uncertainty_engine, limit=None, k=TOP_K):
+        """
+        Batch equivalent of infer_careers() followed by
+        apply_uncertainty_to_recommendations(). Recommendation dicts are
+        only built for the first ``limit`` entries of each student.
+        """
+        top = self.adjusted_top_k(self.subject_matrix(students), uncertainty_engine, k)
+        results = []
+        for student_data, row in zip(students, top.tolist()):
+            recommendations = []
+            for career_col, score, rank, confidence, level, _ in [entry for entry in row if entry[5]][:limit]:
+                recommendation = self.engine._build_recommendation(self.careers[career_col], score, rank, student_data)
+                recommendation['confidence_score'] = confidence
+                recommendation['uncertainty_level'] = UNCERTAINTY_LEVELS[level]
+                recommendations.append(recommendation)
+            results.append(recommendations)
+        return results
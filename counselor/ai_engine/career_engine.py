@@ -0,0 +1,121 @@
+import threading
+
+from .knowledge_base import KnowledgeBase
+from .fopl_rules import FOPLRuleEngine
+from .inference_engine import ForwardChainingEngine
+from .rule_dsl import load_rules
+from .uncertainty_engine import UncertaintyEngine
+from .result_cache import InferenceCache
+from .timing import span
+
+
+class CareerInferenceEngine:
+    """
+    Compiled career inference pipeline (knowledge base, FOPL rules,
+    forward chaining and uncertainty handling) built once and shared
+    """
+
+    def __init__(self, knowledge_base=None, rules=None):
+        self.kb = knowledge_base if knowledge_base is not None else KnowledgeBase()
+        self.fopl_engine = FOPLRuleEngine(self.kb, rules)
+        self.inference_engine = ForwardChainingEngine(self.kb, self.fopl_engine)
+        self.uncertainty_engine = UncertaintyEngine()
+        self.version = f"{self.kb.fingerprint()}-{self.fopl_engine.fingerprint()}"
+        self.ruleset_version = None  # Database rule set it was loaded from, if any
+        self._batch_scorer = None
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Build an engine from export_state() output. Rules may also be
+        given as rule_dsl lines; missing parts fall back to the defaults.
+        """
+        rules = state.get('rules')
+        return cls(KnowledgeBase.from_state(state), load_rules(rules) if rules is not None else None)
+
+    def export_state(self):
+        """JSON-serialisable knowledge base and rule set"""
+        state = self.kb.export_state()
+        state['rules'] = self.fopl_engine.export_rules()
+        return state
+
+    @property
+    def batch_scorer(self):
+        """NumPy batch scorer, created on first use so NumPy stays optional"""
+        if self._batch_scorer is None:
+            from .batch_scoring import BatchScorer
+
+            self._batch_scorer = BatchScorer(self.inference_engine)
+        return self._batch_scorer
+
+    def infer_careers(self, student_data):
+        """Run forward chaining only, without uncertainty adjustment"""
+        return self.inference_engine.infer_careers(student_data)
+
+    def infer_careers_batch(self, students):
+        """Batch forward chaining; one recommendation list per student"""
+        if self.fopl_engine.variable_rules:
+            # Unification is not vectorised; rules with variables run per student
+            return [self.infer_careers(student_data) for student_data in students]
+        return self.batch_scorer.infer_careers(students)
+
+    def recommend_batch(self, students, limit=None):
+        """
+        Batch inference and uncertainty adjustment without the result
+        cache; only the first ``limit`` recommendations of each student
+        are materialised
+        """
+        if self.fopl_engine.variable_rules:
+            return [self.apply_uncertainty(self.infer_careers(student_data))[:limit] for student_data in students]
+        return self.batch_scorer.recommend(students, self.uncertainty_engine, limit)
+
+    def apply_uncertainty(self, recommendations):
+        """Apply the uncertainty model to raw recommendations"""
+        return self.uncertainty_engine.apply_uncertainty_to_recommendations(recommendations)
+
+    def _recommend_uncached(self, student_data):
+        with span('inference'):
+            recommendations = self.infer_careers(student_data)
+        with span('uncertainty'):
+            return self.apply_uncertainty(recommendations)
+
+    def recommend(self, student_data, use_cache=True):
+        """
+        Full pipeline: inference followed by uncertainty adjustment,
+        served from the shared result cache when possible
+        """
+        if not use_cache:
+            return self._recommend_uncached(student_data)
+        return inference_cache.get_or_compute(student_data, self.version, self._recommend_uncached)
+
+
+# Shared by every engine; entries are tagged with the engine version
+inference_cache = InferenceCache()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Return the process-wide engine, building it on first use.
+    Views must treat the returned engine as read-only.
+    """
+    global _engine
+    engine = _engine
+    if engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = CareerInferenceEngine()
+            engine = _engine
+    return engine
+
+
+def set_engine(engine):
+    """
+    Atomically replace the process-wide engine. Requests that already
+    hold the previous engine finish with it.
+    """
+    global _engine
+    with _engine_lock:
+        _engine = engine
@@ -0,0 +1,256 @@
+"""
+Table-driven fallback recommendations, used when the inference engine is
+unavailable or fails. The tables below are indexed once at import; a
+student is scored in a single pass over the rows their profile selects.
+"""
+
+from .inference_engine import top_k
+from .result_cache import InferenceCache
+
+FALLBACK_TOP_K = 8  # Recommendations returned by the fallback
+FALLBACK_VERSION = 'fallback-1'  # Cache version; bump when the tables change
+INTEREST_SCORE_CAP = 85  # Interest-only matches never score above this
+DEFAULT_SALARY_RANGE = '$40,000 - $80,000'
+
+# interest -> education level -> (career, base score, description)
+INTEREST_CAREERS = {
+    'engineering': {
+        'highschool': [
+            ('Software Developer Trainee', 55, 'Entry-level programming'),
+            ('Engineering Technician', 52, 'Technical support role'),
+            ('CAD Drafter', 54, 'Technical drawing'),
+            ('IT Support Specialist', 50, 'Computer support')
+        ],
+        'undergrad': [
+            ('Software Engineer', 68, 'Full-stack development'),
+            ('Mechanical Engineer', 66, 'Design and manufacturing'),
+            ('Civil Engineer', 65, 'Infrastructure projects'),
+            ('Electrical Engineer', 67, 'Electronics systems'),
+            ('Data Engineer', 64, 'Big data infrastructure')
+        ],
+        'postgrad': [
+            ('Senior Software Architect', 75, 'Advanced system design'),
+            ('Research Engineer', 73, 'Technology research'),
+            ('Engineering Manager', 72, 'Technical leadership'),
+            ('AI/ML Engineer', 74, 'Machine learning'),
+            ('Principal Engineer', 71, 'Technical strategy')
+        ]
+    },
+    'science': {
+        'highschool': [
+            ('Lab Technician', 52, 'Laboratory support'),
+            ('Medical Assistant', 54, 'Healthcare support'),
+            ('Science Teacher Assistant', 50, 'Educational support'),
+        ],
+        'undergrad': [
+            ('Research Scientist', 66, 'Scientific research'),
+            ('Data Analyst', 64, 'Statistical analysis'),
+            ('Environmental Scientist', 63, 'Environmental protection'),
+            ('Biologist', 65, 'Life sciences research'),
+        ],
+        'postgrad': [
+            ('Senior Research Scientist', 73, 'Research leadership'),
+            ('Principal Investigator', 75, 'Grant-funded research'),
+            ('Science Director', 72, 'Science management'),
+            ('Medical Researcher', 74, 'Biomedical research'),
+        ]
+    },
+    'business': {
+        'highschool': [
+            ('Sales Representative', 48, 'Product sales'),
+            ('Customer Service Manager', 50, 'Customer support'),
+            ('Office Manager', 52, 'Administrative support'),
+        ],
+        'undergrad': [
+            ('Business Analyst', 62, 'Business process analysis'),
+            ('Marketing Manager', 64, 'Brand management'),
+            ('Financial Advisor', 63, 'Financial planning'),
+            ('Project Manager', 66, 'Project coordination'),
+        ],
+        'postgrad': [
+            ('Business Consultant', 70, 'Strategic advisory'),
+            ('Strategy Director', 73, 'Corporate strategy'),
+            ('Investment Manager', 72, 'Portfolio management'),
+            ('Management Consultant', 71, 'Organizational transformation'),
+        ]
+    },
+    'arts': {
+        'highschool': [
+            ('Graphic Design Assistant', 50, 'Visual design support'),
+            ('Creative Assistant', 52, 'Creative projects'),
+            ('Social Media Creator', 54, 'Content creation'),
+        ],
+        'undergrad': [
+            ('UX/UI Designer', 66, 'User experience design'),
+            ('Art Director', 64, 'Creative direction'),
+            ('Creative Writer', 62, 'Content writing'),
+            ('Brand Designer', 63, 'Brand identity'),
+        ],
+        'postgrad': [
+            ('Creative Director', 72, 'Creative leadership'),
+            ('Art Gallery Owner', 70, 'Art business'),
+            ('Professor of Arts', 69, 'Arts education'),
+            ('Design Strategist', 73, 'Design thinking'),
+        ]
+    }
+}
+
+# interest -> (personality trait, bonus) for interest-based matches
+INTEREST_TRAIT_BONUSES = {
+    'engineering': [('analytical', 4), ('problem_solving', 4)],
+    'science': [('analytical', 3), ('helping', 3)],
+    'business': [('leadership', 4), ('social', 3)],
+    'arts': [('creative', 5)],
+}
+YOUNG_AGE = 25
+YOUNG_INTERESTS = {'engineering': 2, 'science': 2}  # Bonus below YOUNG_AGE
+
+# Education level -> (career, score) when no interest matched
+GENERAL_CAREERS = {
+    'highschool': [('Customer Service Representative', 45), ('Administrative Assistant', 47)],
+    'undergrad': [('Business Analyst', 58), ('Project Coordinator', 60)],
+    'postgrad': [('Management Consultant', 68), ('Research Analyst', 66)]
+}
+
+SALARY_RANGES = {
+    # Technology
+    'Software Engineer': '$70,000 - $120,000',
+    'Software Developer Trainee': '$40,000 - $60,000',
+    'Data Engineer': '$75,000 - $130,000',
+    'AI/ML Engineer': '$90,000 - $160,000',
+    'Senior Software Architect': '$120,000 - $200,000',
+    'IT Support Specialist': '$35,000 - $55,000',
+
+    # Business
+    'Business Analyst': '$60,000 - $95,000',
+    'Marketing Manager': '$65,000 - $110,000',
+    'Project Manager': '$70,000 - $120,000',
+    'Financial Advisor': '$55,000 - $95,000',
+    'Business Consultant': '$80,000 - $150,000',
+
+    # Science
+    'Research Scientist': '$65,000 - $110,000',
+    'Data Analyst': '$50,000 - $85,000',
+    'Lab Technician': '$35,000 - $55,000',
+    'Environmental Scientist': '$55,000 - $90,000',
+
+    # Arts & Design
+    'UX/UI Designer': '$55,000 - $90,000',
+    'Graphic Design Assistant': '$30,000 - $45,000',
+    'Art Director': '$65,000 - $110,000',
+    'Creative Director': '$90,000 - $150,000',
+
+    # Engineering
+    'Mechanical Engineer': '$70,000 - $115,000',
+    'Civil Engineer': '$65,000 - $105,000',
+    'Electrical Engineer': '$70,000 - $120,000',
+    'Engineering Technician': '$45,000 - $70,000',
+}
+
+
+class FallbackEngine:
+    """
+    Interest based recommendations from the tables above.
+
+    Holds only read-only indexes, so the module-level instance is shared
+    by every request; results go through the same InferenceCache and
+    top-k selection as the inference engine.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else InferenceCache()
+
+        # (interest, education level) -> (career, base score, reasoning,
+        # category, description, salary range)
+        self.interest_index = {}
+        for interest, levels in INTEREST_CAREERS.items():
+            for education_level, careers in levels.items():
+                self.interest_index[(interest, education_level)] = tuple(
+                    (
+                        career_title,
+                        base_score,
+                        f"{description}. Matches {interest} interest and {education_level} level.",
+                        interest.title(),
+                        description,
+                        self.salary_range(career_title),
+                    )
+                    for career_title, base_score, description in careers
+                )
+
+        # Education level -> (career, score, salary range)
+        self.general_index = {
+            education_level: tuple(
+                (career_title, score, self.salary_range(career_title)) for career_title, score in careers
+            )
+            for education_level, careers in GENERAL_CAREERS.items()
+        }
+
+    def salary_range(self, career_title):
+        """Salary range for a career"""
+        return SALARY_RANGES.get(career_title, DEFAULT_SALARY_RANGE)
+
+    def recommend(self, student_data, use_cache=True):
+        """Interest-based recommendations, cached per profile"""
+        if not use_cache:
+            return self.recommend_from_interests(student_data)
+        return self.cache.get_or_compute(student_data, FALLBACK_VERSION, self.recommend_from_interests)
+
+    def recommend_from_interests(self, student_data):
+        """
+        Careers for each (interest, education level) of the student with
+        trait and age bonuses; general careers when no interest matches
+        """
+        interests = student_data.get('career_interests', [])
+        personality = student_data.get('personality_traits', {})
+        education_level = student_data.get('education_level', 'highschool')
+        age = student_data.get('age', 18)
+
+        recommendations = []
+        seen = set()
+        for interest in interests:
+            careers = self.interest_index.get((interest, education_level), ())
+            if not careers:
+                continue
+
+            bonus = 0
+            for trait, trait_bonus in INTEREST_TRAIT_BONUSES.get(interest, ()):
+                if personality.get(trait, False):
+                    bonus += trait_bonus
+            if age < YOUNG_AGE:
+                bonus += YOUNG_INTERESTS.get(interest, 0)
+
+            for career_title, base_score, reasoning, category, description, salary_range in careers:
+                # The first interest to suggest a career wins
+                if career_title in seen:
+                    continue
+                seen.add(career_title)
+
+                score = min(base_score + bonus, INTEREST_SCORE_CAP)
+                recommendations.append({
+                    'career_name': career_title,
+                    'confidence_score': int(score),
+                    'reasoning': reasoning,
+                    'category': category,
+                    'description': description,
+                    'salary_range': salary_range,
+                    'growth_prospects': 'High' if score > 70 else 'Medium'
+                })
+
+        if not recommendations:
+            # Unknown levels get the undergrad careers but keep their own name
+            for career_title, score, salary_range in self.general_index.get(
+                    education_level, self.general_index['undergrad']):
+                recommendations.append({
+                    'career_name': career_title,
+                    'confidence_score': score,
+                    'reasoning': f"General match for {education_level} education",
+                    'category': 'General',
+                    'description': 'Professional career path',
+                    'salary_range': salary_range,
+                    'growth_prospects': 'Medium'
+                })
+
+        return top_k(recommendations, FALLBACK_TOP_K, key=lambda rec: rec['confidence_score'])
+
+
+fallback_engine = FallbackEngine()
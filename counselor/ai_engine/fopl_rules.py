@@ -1,46 +1,145 @@
+import hashlib
+import json
+import sys
+import weakref
+
+from .unification import FactStore, is_variable, solve, substitute, unify
+
 class FOPLRule:
     """
     First-Order Predicate Logic Rule
     """
     
+    __slots__ = ('name', 'conditions', 'conclusion', 'confidence')
+    
     def __init__(self, name, conditions, conclusion, confidence=1.0):
-        self.name = name
-        self.conditions = conditions  # List of predicates
+        self.name = sys.intern(name)
+        self.conditions = tuple(conditions)  # Predicates, shared via Predicate interning
         self.conclusion = conclusion  # Conclusion predicate
         self.confidence = confidence
     
     def __str__(self):
-        return f"Rule {self.name}: {self.conditions} => {self.conclusion}"
+        return f"Rule {self.name}: {list(self.conditions)} => {self.conclusion}"
+    
+    def is_ground(self):
+        """True if no condition or conclusion contains a variable"""
+        return not self.conclusion.variables() and not any(c.variables() for c in self.conditions)
+    
+    def to_dict(self):
+        """JSON-serialisable form, see from_dict()"""
+        return {
+            'name': self.name,
+            'conditions': [condition.to_dict() for condition in self.conditions],
+            'conclusion': self.conclusion.to_dict(),
+            'confidence': self.confidence,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            name=data['name'],
+            conditions=[Predicate.from_dict(condition) for condition in data['conditions']],
+            conclusion=Predicate.from_dict(data['conclusion']),
+            confidence=data.get('confidence', 1.0)
+        )
 
 class Predicate:
     """
     Represents a logical predicate
+    
+    Predicates are immutable and hash-consed: constructing an equal
+    predicate returns the live instance, so rule sets (and engines built
+    from the same rules) share them. Names and string arguments are
+    interned and the hash is computed once, which makes predicates cheap
+    index keys.
     """
     
-    def __init__(self, name, args=None, negated=False):
-        self.name = name
-        self.args = args if args else []
-        self.negated = negated
+    __slots__ = ('name', 'args', 'negated', '_hash', '__weakref__')
+    
+    _interned = weakref.WeakValueDictionary()  # (name, args, negated) -> Predicate
+    
+    def __new__(cls, name, args=None, negated=False):
+        name = sys.intern(name)
+        args = tuple(sys.intern(arg) if type(arg) is str else arg for arg in args) if args else ()
+        key = (name, args, bool(negated))
+        predicate = cls._interned.get(key)
+        if predicate is None:
+            predicate = object.__new__(cls)
+            set_attr = object.__setattr__
+            set_attr(predicate, 'name', name)
+            set_attr(predicate, 'args', args)
+            set_attr(predicate, 'negated', key[2])
+            set_attr(predicate, '_hash', hash(key))
+            predicate = cls._interned.setdefault(key, predicate)
+        return predicate
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __reduce__(self):
+        return (Predicate, (self.name, self.args, self.negated))
+    
+    def __hash__(self):
+        return self._hash
+    
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Predicate):
+            return NotImplemented
+        # Interning makes equal predicates identical; this covers copies
+        # made before an instance was collected and re-created
+        return (self._hash == other._hash and self.name == other.name and
+                self.args == other.args and self.negated == other.negated)
+    
+    def __repr__(self):
+        return str(self)
     
     def __str__(self):
         args_str = ', '.join(str(arg) for arg in self.args)
         pred_str = f"{self.name}({args_str})" if self.args else self.name
         return f"¬{pred_str}" if self.negated else pred_str
     
+    def to_dict(self):
+        data = {'name': self.name, 'args': list(self.args)}
+        if self.negated:
+            data['negated'] = True
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data.get('args', ()), data.get('negated', False))
+    
+    def variables(self):
+        """Variables ('?X' arguments) in order of appearance"""
+        return [arg for arg in self.args if is_variable(arg)]
+    
     def matches(self, other):
-        """Check if this predicate matches another"""
-        return (self.name == other.name and 
-                len(self.args) == len(other.args) and
-                self.negated == other.negated)
+        """Check if this predicate unifies with another"""
+        return (self.name == other.name and
+                self.negated == other.negated and
+                unify(self.args, other.args) is not None)
 
 class FOPLRuleEngine:
     """
     FOPL Rule Engine for career counseling
     """
     
-    def __init__(self, knowledge_base):
+    def __init__(self, knowledge_base, rules=None):
         self.kb = knowledge_base
-        self.rules = self._initialize_fopl_rules()
+        self.rules = list(rules) if rules is not None else self._initialize_fopl_rules()
+        
+        # Ground rules are compiled to bit masks by ForwardChainingEngine;
+        # rules with variables are matched by unification against a
+        # per-student FactStore
+        self.ground_rules = [rule for rule in self.rules if rule.is_ground()]
+        self.variable_rules = [rule for rule in self.rules if not rule.is_ground()]
+        for rule in self.variable_rules:
+            self._check_safe(rule)
+        self.background = self._background_facts() if self.variable_rules else FactStore()
     
     def _initialize_fopl_rules(self):
         rules = []
@@ -120,35 +219,63 @@ class FOPLRuleEngine:
         
         return rules
     
-    def evaluate_conditions(self, rule, facts):
-        """Evaluate if all conditions of a rule are satisfied"""
-        satisfied_conditions = 0
-        total_conditions = len(rule.conditions)
-        
-        for condition in rule.conditions:
-            if self._evaluate_predicate(condition, facts):
-                satisfied_conditions += 1
-        
-        return satisfied_conditions / total_conditions if total_conditions > 0 else 0
-    
-    def _evaluate_predicate(self, predicate, facts):
-        """Evaluate a single predicate against facts"""
-        if predicate.name == "high_score":
-            subject = predicate.args[0]
-            score = facts.get(f"score_{subject}", 0)
-            return score >= 75
-        
-        elif predicate.name == "good_score":
-            subject = predicate.args[0]
-            score = facts.get(f"score_{subject}", 0)
-            return score >= 65
-        
-        elif predicate.name == "personality_trait":
-            trait = predicate.args[0]
-            return facts.get(f"trait_{trait}", False)
-        
-        elif predicate.name == "suitable_career":
-            career = predicate.args[0]
-            return facts.get(f"career_{career}", False)
-        
-        return False
\ No newline at end of file
+    def _check_safe(self, rule):
+        """Every conclusion variable must be bound by a positive condition"""
+        bound = {var for condition in rule.conditions if not condition.negated for var in condition.variables()}
+        unbound = [var for var in rule.conclusion.variables() if var not in bound]
+        if unbound:
+            raise ValueError(f"Rule {rule.name}: conclusion variables {unbound} are not bound by any condition")
+    
+    def _background_facts(self):
+        """
+        Knowledge base relations shared by every student:
+        requires(C, S), prefers(C, S), related(S, C) and indicates(S, T)
+        """
+        store = FactStore()
+        for career, info in self.kb.careers_data.items():
+            for subject in info.get('required_subjects', []):
+                store.add('requires', (career, subject))
+                store.add('related', (subject, career))
+            for subject in info.get('preferred_subjects', []):
+                store.add('prefers', (career, subject))
+                store.add('related', (subject, career))
+        for trait, subjects in self.kb.personality_rules.items():
+            for subject in subjects:
+                store.add('indicates', (subject, trait))
+        return store
+    
+    def fact_store(self, subject_scores, traits):
+        """A student's facts, layered over the background facts"""
+        store = FactStore(self.background)
+        for subject, score in subject_scores.items():
+            if score >= 75:
+                store.add('high_score', (subject,))
+            if score >= 65:
+                store.add('good_score', (subject,))
+        for trait, value in traits.items():
+            if value:
+                store.add('personality_trait', (trait,))
+        return store
+    
+    def derive(self, rule, store):
+        """
+        Conclusions of a rule with variables: one ground argument tuple per
+        distinct complete match, in match order. Unlike ground rules there
+        is no partial satisfaction; a match satisfies every condition.
+        """
+        conclusions = {}
+        for bindings in solve(rule.conditions, store):
+            conclusions.setdefault(substitute(rule.conclusion.args, bindings), None)
+        return list(conclusions)
+    
+    def export_rules(self):
+        """JSON-serialisable copy of the rule set"""
+        return [rule.to_dict() for rule in self.rules]
+    
+    def fingerprint(self):
+        """Stable hash of the rule set"""
+        payload = json.dumps([
+            (rule.name, [str(c) for c in rule.conditions], str(rule.conclusion), rule.confidence)
+            for rule in self.rules
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
@@ -1,68 +1,241 @@
+import heapq
+from bisect import bisect_right
+from itertools import accumulate
+
+from .working_memory import FactLayout
+
+TOP_K = 10  # Number of careers kept from the ranking
+MIN_RECOMMENDATION_SCORE = 0.3  # Careers at or below this are dropped
+BOUND_SLACK = 1e-9  # Absorbs float rounding in the score upper bounds
+
+def confidence_percent(score):
+    """Base confidence score (0-100, two decimals) of a 0-1 career score"""
+    return round(score * 100, 2)
+
+def _bits(mask):
+    """The single-bit masks set in mask, lowest first"""
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+def top_k(items, k, key):
+    """
+    The k items with the largest key, best first. Ties keep input order,
+    so this equals sorted(items, key=key, reverse=True)[:k].
+    """
+    best = heapq.nlargest(k, ((key(item), -order, item) for order, item in enumerate(items)))
+    return [item for _, _, item in best]
+
+class InferenceContext:
+    """
+    Per-invocation state of a forward chaining run
+    """
+    
+    def __init__(self, student_data):
+        self.student_data = student_data
+        self.facts = 0  # Working memory bitset, see FactLayout
+        self.career_scores = {}
+        self.recommendations = []
+        self.iterations = 0
+
 class ForwardChainingEngine:
     """
     Forward Chaining Inference Engine
+    
+    Holds only compiled, read-only state (rule masks, careers, trait map),
+    so a single instance can serve concurrent requests; everything produced
+    while inferring lives on the InferenceContext of that call.
     """
     
     def __init__(self, knowledge_base, fopl_engine):
         self.kb = knowledge_base
         self.fopl_engine = fopl_engine
-        self.working_memory = {}
+        self.rules = tuple(fopl_engine.ground_rules)
+        self.variable_rules = tuple(fopl_engine.variable_rules)
+        self.careers = tuple(knowledge_base.careers_data.items())
+        self.trait_map = tuple(
+            (trait, tuple(subjects))
+            for trait, subjects in knowledge_base.personality_rules.items()
+        )
+        self.subject_index = self._build_subject_index()
+        self._compile_rules()
+    
+    def _compile_rules(self):
+        """
+        Lay out the ground facts as bits and compile each ground rule to
+        (rule, masks, condition count, career, career bit); watched is
+        every bit some rule condition tests, and rules_by_bit maps each
+        watched bit to the positions of the compiled rules testing it
+        """
+        self.layout = FactLayout(
+            self.rules,
+            [trait for trait, _ in self.trait_map],
+            [career_key for career_key, _ in self.careers]
+        )
+        self.trait_tests = tuple(
+            (self.layout.bit('personality_trait', trait), subjects)
+            for trait, subjects in self.trait_map
+        )
+        
+        compiled = []
+        rules_by_bit = {}
+        self.watched = 0
+        for rule in self.rules:
+            masks = self.layout.compile_conditions(rule.conditions)
+            for mask in masks:
+                self.watched |= mask
+            career_name = rule.conclusion.args[0] if rule.conclusion.args else None
+            # Rules without conditions or conclusion can never score
+            if rule.conditions and career_name:
+                tested = 0
+                for mask in masks:
+                    tested |= mask
+                for bit in _bits(tested):
+                    rules_by_bit.setdefault(bit, []).append(len(compiled))
+                compiled.append((
+                    rule, masks, len(rule.conditions), career_name,
+                    self.layout.bit('suitable_career', career_name)
+                ))
+        self.compiled_rules = tuple(compiled)
+        self.rules_by_bit = {bit: tuple(positions) for bit, positions in rules_by_bit.items()}
+    
+    def _rules_testing(self, facts):
+        """Compiled rules with a condition on any of these facts, in rule order"""
+        positions = set()
+        for bit in _bits(facts & self.watched):
+            positions.update(self.rules_by_bit[bit])
+        compiled_rules = self.compiled_rules
+        return [compiled_rules[position] for position in sorted(positions)]
+    
+    def _build_subject_index(self):
+        """
+        Inverted index: subject -> {(preferred count, repeat): (thresholds,
+        careers)}, each posting list sorted by threshold.
+        
+        A career only scores when every required subject reaches its
+        min_threshold, so a student only needs to look at careers filed
+        under subjects they scored at or above threshold. Careers are filed
+        under each of their required subjects and grouped by number of
+        preferred subjects and by how often the most repeated one is
+        listed (each listing adds its bonus), which is what _rank_careers
+        bounds on; careers without required subjects can never match and
+        are left out.
+        """
+        postings = {}
+        for position, (career_key, career_info) in enumerate(self.careers):
+            preferred = career_info.get('preferred_subjects', [])
+            group = (len(preferred), max((preferred.count(subject) for subject in preferred), default=1))
+            for subject in set(career_info.get('required_subjects', [])):
+                postings.setdefault(subject, {}).setdefault(group, []).append(
+                    (career_info.get('min_threshold', 60), position, career_key, career_info)
+                )
+        
+        index = {}
+        for subject, groups in postings.items():
+            index[subject] = {}
+            for group, entries in groups.items():
+                entries.sort(key=lambda entry: (entry[0], entry[1]))
+                index[subject][group] = (
+                    [threshold for threshold, _, _, _ in entries],
+                    [(position, career_key, career_info) for _, position, career_key, career_info in entries]
+                )
+        return index
     
     def infer_careers(self, student_data):
         """
         Main inference method using forward chaining
         """
-        # Initialize working memory with student facts
-        self._initialize_working_memory(student_data)
+        return self.infer(student_data).recommendations
+    
+    def infer(self, student_data):
+        """
+        Run forward chaining and return the InferenceContext of this call
+        """
+        context = InferenceContext(student_data)
+        subject_scores = student_data.get('subject_scores', {})
         
-        # Apply rules iteratively
-        career_scores = {}
+        # Working memory: one bit per ground fact (see FactLayout)
+        context.facts = self.layout.encode_scores(subject_scores) | self._encode_traits(subject_scores)
+        
+        # Rules with variables are matched by unification against the same
+        # facts; they are re-run whenever a pass derives new facts
+        fact_store = self._fact_store(student_data) if self.variable_rules else None
+        unify_pending = fact_store is not None
+        
+        # Apply rules iteratively; another pass is only needed when a pass
+        # derives a fact some rule condition tests, and it only re-checks
+        # the rules testing those facts: facts are never retracted, so
+        # every other rule would reproduce its previous outcome
+        career_scores = context.career_scores
+        pending = bool(context.facts & self.watched)
+        candidates = self.compiled_rules
         max_iterations = 10
-        iteration = 0
         
-        while iteration < max_iterations:
-            new_inferences = False
+        while (pending or unify_pending) and context.iterations < max_iterations:
+            derived = 0
+            derived_careers = []
             
-            # Apply FOPL rules
-            for rule in self.fopl_engine.rules:
-                satisfaction_level = self.fopl_engine.evaluate_conditions(rule, self.working_memory)
+            # Apply FOPL rules: satisfied conditions are popcounts
+            facts = context.facts
+            for rule, masks, total, career_name, career_bit in candidates:
+                satisfied = 0
+                for mask in masks:
+                    satisfied += (facts & mask).bit_count()
                 
-                if satisfaction_level > 0.5:  # Threshold for rule activation
-                    career_name = rule.conclusion.args[0] if rule.conclusion.args else None
-                    if career_name:
-                        current_score = career_scores.get(career_name, 0)
-                        new_score = satisfaction_level * rule.confidence
-                        career_scores[career_name] = max(current_score, new_score)
-                        new_inferences = True
+                if satisfied * 2 > total:  # Satisfaction above 0.5 activates the rule
+                    current_score = career_scores.get(career_name, 0)
+                    new_score = satisfied / total * rule.confidence
+                    career_scores[career_name] = max(current_score, new_score)
+                    derived |= career_bit
+                    derived_careers.append(career_name)
             
-            # Apply direct matching rules
-            direct_matches = self._apply_direct_matching(student_data)
-            for career, score in direct_matches.items():
-                current_score = career_scores.get(career, 0)
-                career_scores[career] = max(current_score, score)
-                new_inferences = True
+            if unify_pending:
+                for rule in self.variable_rules:
+                    for args in self.fopl_engine.derive(rule, fact_store):
+                        career_name = args[0] if args else None
+                        if career_name:
+                            career_scores[career_name] = max(career_scores.get(career_name, 0), rule.confidence)
+                            derived |= self.layout.bit('suitable_career', career_name)
+                            derived_careers.append(career_name)
             
-            if not new_inferences:
-                break
+            # Assert newly derived conclusions as facts
+            new_facts = derived & ~facts
+            context.facts = facts | derived
+            pending = bool(new_facts & self.watched)
+            candidates = self._rules_testing(new_facts) if pending else ()
+            if fact_store is not None:
+                unify_pending = False
+                for career_name in derived_careers:
+                    if fact_store.add('suitable_career', (career_name,)):
+                        unify_pending = True
             
-            iteration += 1
+            context.iterations += 1
         
-        # Convert to recommendations
-        recommendations = self._generate_recommendations(career_scores, student_data)
-        return recommendations
+        # Add direct matches (subject scores only) and convert to recommendations
+        context.recommendations = self._generate_recommendations(career_scores, student_data)
+        return context
     
-    def _initialize_working_memory(self, student_data):
-        """Initialize working memory with student facts"""
-        self.working_memory = {}
-        
-        # Add subject scores
-        for subject, score in student_data.get('subject_scores', {}).items():
-            self.working_memory[f"score_{subject}"] = score
-        
-        # Infer personality traits based on subject preferences
-        personality_traits = self._infer_personality_traits(student_data)
-        for trait, value in personality_traits.items():
-            self.working_memory[f"trait_{trait}"] = value
+    def _encode_traits(self, subject_scores):
+        """personality_trait bits, same test as _infer_personality_traits"""
+        bits = 0
+        for trait_bit, related_subjects in self.trait_tests:
+            trait_score = 0
+            relevant_subjects = 0
+            for subject in related_subjects:
+                if subject in subject_scores:
+                    trait_score += subject_scores[subject]
+                    relevant_subjects += 1
+            if relevant_subjects > 0 and trait_score / relevant_subjects > 70:
+                bits |= trait_bit
+        return bits
+    
+    def _fact_store(self, student_data):
+        """Student facts for unification, including subjects no ground rule tests"""
+        return self.fopl_engine.fact_store(
+            student_data.get('subject_scores', {}),
+            self._infer_personality_traits(student_data)
+        )
     
     def _infer_personality_traits(self, student_data):
         """Infer personality traits from subject scores and preferences"""
@@ -70,7 +243,7 @@ class ForwardChainingEngine:
         subject_scores = student_data.get('subject_scores', {})
         
         # Analyze subject performance patterns
-        for trait, related_subjects in self.kb.personality_rules.items():
+        for trait, related_subjects in self.trait_map:
             trait_score = 0
             relevant_subjects = 0
             
@@ -86,17 +259,107 @@ class ForwardChainingEngine:
         return traits
     
     def _apply_direct_matching(self, student_data):
-        """Apply direct career matching based on subject combinations"""
+        """
+        Apply direct career matching based on subject combinations.
+        Exhaustive; infer() uses the pruned search in _rank_careers.
+        """
         career_scores = {}
         subject_scores = student_data.get('subject_scores', {})
         
-        for career_key, career_info in self.kb.careers_data.items():
+        candidates = {}
+        for subject, score in subject_scores.items():
+            for thresholds, careers in self.subject_index.get(subject, {}).values():
+                for candidate in careers[:bisect_right(thresholds, score)]:
+                    candidates[candidate[0]] = candidate
+        
+        # Knowledge base order is kept: it breaks ties in the ranking
+        for position in sorted(candidates):
+            _, career_key, career_info = candidates[position]
             score = self._calculate_career_match_score(career_info, subject_scores)
             if score > 0:
                 career_scores[career_key] = score
         
         return career_scores
     
+    def _rank_careers(self, career_scores, subject_scores, k=TOP_K):
+        """
+        Branch-and-bound top k over rule conclusions and direct matches.
+        
+        Returns, best first, the (career_key, score) pairs that sorting rule
+        scores merged with _apply_direct_matching() and keeping the top k
+        gives, ties in insertion order (pairs that cannot beat
+        MIN_RECOMMENDATION_SCORE may be left out). Careers concluded by
+        rules are scored exactly. Direct-match candidates are visited in
+        groups (subject S, preferred count p, repeat r) by decreasing upper
+        bound
+        
+            min((score[S] + best p preferred bonuses, each up to r times) / 100, 1)
+        
+        A career is first reached under its best-scored required subject,
+        and no average of required scores exceeds that score, so the bound
+        holds for every career in the group. The search stops once a bound
+        falls below the k-th score; careers that could only tie it are
+        skipped unless they come earlier in insertion order. career_scores
+        is updated in place with every career that was evaluated.
+        """
+        careers_data = self.kb.careers_data
+        for career_key, score in career_scores.items():
+            career_info = careers_data.get(career_key)
+            if career_info is not None:
+                career_scores[career_key] = max(score, self._calculate_career_match_score(career_info, subject_scores))
+        
+        # Heap of the k best as (score, -order); order reproduces the
+        # stable sort: rule conclusions first, then knowledge base order
+        top = heapq.nlargest(k, (
+            (score, -order, career_key) for order, (career_key, score) in enumerate(career_scores.items())
+        ))
+        heapq.heapify(top)
+        rule_careers = len(career_scores)
+        
+        # bonus_bounds[r][p]: the largest total bonus p preferred subjects
+        # can add when each subject is listed at most r times
+        bonuses = sorted((max(min(score * 0.1, 10), 0) for score in subject_scores.values()), reverse=True)
+        bonus_bounds = {}
+        
+        groups = []
+        for subject, score in subject_scores.items():
+            for (preferred_count, repeat), (thresholds, careers) in self.subject_index.get(subject, {}).items():
+                end = bisect_right(thresholds, score)
+                if end:
+                    bonus_bound = bonus_bounds.get(repeat)
+                    if bonus_bound is None:
+                        bonus_bound = bonus_bounds[repeat] = list(
+                            accumulate((bonus for bonus in bonuses for _ in range(repeat)), initial=0)
+                        )
+                    bonus = bonus_bound[min(preferred_count, len(bonus_bound) - 1)]
+                    groups.append((min((score + bonus) / 100 + BOUND_SLACK, 1.0), careers, end))
+        groups.sort(key=lambda group: group[0], reverse=True)
+        
+        seen = set(career_scores)
+        for bound, careers, end in groups:
+            if bound <= MIN_RECOMMENDATION_SCORE or (len(top) >= k and bound < top[0][0]):
+                break  # Bounds only decrease from here
+            
+            for position, career_key, career_info in careers[:end]:
+                if career_key in seen:
+                    continue
+                seen.add(career_key)
+                order = rule_careers + position
+                if len(top) >= k and (bound, -order) < top[0][:2]:
+                    continue  # Could at best tie the k-th career, which ranks first
+                
+                score = self._calculate_career_match_score(career_info, subject_scores)
+                if score <= 0:
+                    continue
+                career_scores[career_key] = score
+                entry = (score, -order, career_key)
+                if len(top) < k:
+                    heapq.heappush(top, entry)
+                elif entry > top[0]:
+                    heapq.heapreplace(top, entry)
+        
+        return [(career_key, score) for score, _, career_key in sorted(top, reverse=True)]
+    
     def _calculate_career_match_score(self, career_info, subject_scores):
         """Calculate how well a student matches a specific career"""
         required_subjects = career_info.get('required_subjects', [])
@@ -138,27 +401,30 @@ class ForwardChainingEngine:
         """Generate final career recommendations with explanations"""
         recommendations = []
         
-        # Sort careers by score
-        sorted_careers = sorted(career_scores.items(), key=lambda x: x[1], reverse=True)
+        # Top 10 of rule scores merged with direct matches
+        ranked = self._rank_careers(career_scores, student_data.get('subject_scores', {}))
         
-        for i, (career_key, score) in enumerate(sorted_careers[:10]):  # Top 10
-            if score > 0.3:  # Minimum threshold
-                career_info = self.kb.careers_data.get(career_key, {})
-                
-                recommendation = {
-                    'career_name': career_info.get('name', career_key.replace('_', ' ').title()),
-                    'confidence_score': round(score * 100, 2),
-                    'rank': i + 1,
-                    'description': career_info.get('description', ''),
-                    'category': career_info.get('category', 'General'),
-                    'reasoning': self._generate_reasoning(career_key, career_info, student_data),
-                    'required_subjects': career_info.get('required_subjects', []),
-                    'preferred_subjects': career_info.get('preferred_subjects', [])
-                }
-                recommendations.append(recommendation)
+        for i, (career_key, score) in enumerate(ranked):
+            if score > MIN_RECOMMENDATION_SCORE:  # Minimum threshold
+                recommendations.append(self._build_recommendation(career_key, score, i + 1, student_data))
         
         return recommendations
     
+    def _build_recommendation(self, career_key, score, rank, student_data):
+        """Build the recommendation dict for one ranked career"""
+        career_info = self.kb.careers_data.get(career_key, {})
+        
+        return {
+            'career_name': career_info.get('name', career_key.replace('_', ' ').title()),
+            'confidence_score': confidence_percent(score),
+            'rank': rank,
+            'description': career_info.get('description', ''),
+            'category': career_info.get('category', 'General'),
+            'reasoning': self._generate_reasoning(career_key, career_info, student_data),
+            'required_subjects': career_info.get('required_subjects', []),
+            'preferred_subjects': career_info.get('preferred_subjects', [])
+        }
+    
     def _generate_reasoning(self, career_key, career_info, student_data):
         """Generate explanation for why this career was recommended"""
         reasoning_parts = []
@@ -0,0 +1,212 @@
+import numpy as np
+
+from .inference_engine import MIN_RECOMMENDATION_SCORE
+from .knowledge_base import KnowledgeBase
+from .rule_dsl import normalize_state
+from .unification import is_variable
+
+
+def _has_variables(rule):
+    predicates = rule['conditions'] + [rule['conclusion']]
+    return any(is_variable(arg) for predicate in predicates for arg in predicate.get('args', []))
+
+
+def _relevant_subjects(states, careers):
+    """
+    Subjects a student must have at least one of for any of ``careers``
+    to score under any of ``states``: required subjects (direct matches
+    need all of them) and, for the rules concluding a career, the
+    subjects behind their conditions, following suitable_career(X)
+    conditions to X. A rule fires only when a condition fact holds, and
+    every such fact comes from a subject score.
+    """
+    subjects = set()
+    seen = set()
+    stack = list(careers)
+    while stack:
+        career = stack.pop()
+        if career in seen:
+            continue
+        seen.add(career)
+        for state in states:
+            subjects.update(state.get('careers', {}).get(career, {}).get('required_subjects', []))
+            for rule in state.get('rules', []):
+                if rule['conclusion']['args'][:1] != [career]:
+                    continue
+                for condition in rule['conditions']:
+                    arg = condition['args'][0] if condition['args'] else None
+                    if condition['name'] in ('high_score', 'good_score'):
+                        subjects.add(arg)
+                    elif condition['name'] == 'personality_trait':
+                        for trait_state in states:
+                            subjects.update(trait_state.get('personality_rules', {}).get(arg, []))
+                    elif condition['name'] == 'suitable_career':
+                        stack.append(arg)
+    subjects.discard(None)
+    return sorted(subjects)
+
+
+def _display_name(career_key, careers):
+    info = careers.get(career_key, {})
+    return info.get('name', career_key.replace('_', ' ').title())
+
+
+class EngineDiff:
+    """
+    Difference between two engine states (CareerInferenceEngine.export_state()).
+
+    ``affected_careers`` are the careers whose score can differ for some
+    student: careers that were added, removed or edited, careers concluded
+    by changed rules or by rules reading changed traits, and, transitively,
+    careers concluded by rules that depend on an affected career.
+    ``stale_names`` are display names of edited/removed careers; results
+    listing them need refreshing even if no score moved.
+    ``relevant_subjects`` are the subjects a student needs at least one of
+    for any affected career to score, or None when rules with variables
+    make that unbounded; students without any can only be affected
+    through a stale listing.
+    """
+
+    def __init__(self, old_state, new_state):
+        old_state = normalize_state(old_state)
+        new_state = normalize_state(new_state)
+        career_diff = KnowledgeBase.from_state(new_state).diff(old_state)
+        self.added_careers = career_diff['added']
+        self.removed_careers = career_diff['removed']
+        self.changed_careers = career_diff['changed']
+        self.changed_traits = career_diff['traits']
+
+        old_rules = old_state.get('rules', [])
+        new_rules = new_state.get('rules', [])
+        old_by_name = {rule['name']: rule for rule in old_rules}
+        new_by_name = {rule['name']: rule for rule in new_rules}
+        changed_rules = {
+            name for name in set(old_by_name) | set(new_by_name)
+            if old_by_name.get(name) != new_by_name.get(name)
+        }
+        # Rule order decides tie-breaks, so a reordering touches every rule
+        common = set(old_by_name) & set(new_by_name)
+        if [r['name'] for r in old_rules if r['name'] in common] != [r['name'] for r in new_rules if r['name'] in common]:
+            changed_rules |= common
+        self.changed_rules = sorted(changed_rules)
+
+        all_rules = old_rules + new_rules
+        affected = set(self.added_careers) | set(self.removed_careers) | set(self.changed_careers)
+        # Career order breaks ties between equal scores too
+        old_careers = old_state.get('careers', {})
+        new_careers = new_state.get('careers', {})
+        common_careers = set(old_careers) & set(new_careers)
+        if [c for c in old_careers if c in common_careers] != [c for c in new_careers if c in common_careers]:
+            affected |= common_careers
+        traits = set(self.changed_traits)
+        for rule in all_rules:
+            reads_changed_trait = any(
+                condition['name'] == 'personality_trait' and condition['args'][:1] and condition['args'][0] in traits
+                for condition in rule['conditions']
+            )
+            if (rule['name'] in changed_rules or reads_changed_trait) and rule['conclusion']['args']:
+                affected.add(rule['conclusion']['args'][0])
+
+        # Chained rules: suitable_career(X) conditions propagate changes
+        grew = True
+        while grew:
+            grew = False
+            for rule in all_rules:
+                conclusion = rule['conclusion']['args'][0] if rule['conclusion']['args'] else None
+                if conclusion is None or conclusion in affected:
+                    continue
+                if any(condition['name'] == 'suitable_career' and condition['args'][:1]
+                       and condition['args'][0] in affected for condition in rule['conditions']):
+                    affected.add(conclusion)
+                    grew = True
+
+        # A rule with variables can conclude any career from any knowledge
+        # base relation, so any change touches every career
+        self.has_variable_rules = any(_has_variables(rule) for rule in all_rules)
+        if self.has_variable_rules and (affected or changed_rules or traits):
+            affected |= set(old_careers) | set(new_careers)
+            affected |= {rule['conclusion']['args'][0] for rule in all_rules if rule['conclusion']['args']}
+        self.affected_careers = sorted(career for career in affected if not is_variable(career))
+        self.relevant_subjects = (
+            None if self.has_variable_rules
+            else _relevant_subjects((old_state, new_state), self.affected_careers)
+        )
+
+        self.stale_names = {
+            _display_name(key, old_careers)
+            for key in self.changed_careers + self.removed_careers + self.affected_careers
+        }
+
+    def is_empty(self):
+        return not self.affected_careers
+
+    def summary(self):
+        return (
+            f"careers added={self.added_careers} removed={self.removed_careers} "
+            f"changed={self.changed_careers}; traits changed={self.changed_traits}; "
+            f"rules changed={self.changed_rules}; affected careers={self.affected_careers}"
+        )
+
+
+def _affected_columns(scorer, careers):
+    return [scorer.career_index[c] for c in careers if c in scorer.career_index]
+
+
+def _tie_rows(scores, columns):
+    """Rows where an affected career is tied with another ranked career"""
+    ties = np.zeros(scores.shape[0], dtype=bool)
+    for col in columns:
+        value = scores[:, col:col + 1]
+        ties |= ((scores == value).sum(axis=1) > 1) & (value[:, 0] > MIN_RECOMMENDATION_SCORE)
+    return ties
+
+
+def affected_students(diff, old_engine, new_engine, students, recommended_names):
+    """
+    Which students can get different recommendations under ``new_engine``.
+
+    ``students`` are student_data dicts and ``recommended_names`` the
+    career names currently shown to each of them. A student is affected if
+    a stale career is currently listed, or an affected career scores
+    differently or sits in an exact tie (whose order may have changed).
+    Only students with a relevant subject and no stale listing are scored,
+    once per engine.
+    """
+    if not students:
+        return []
+    if diff.has_variable_rules:
+        # Not vectorised: every student is treated as affected
+        return [True] * len(students)
+
+    stale = diff.stale_names
+    flags = [not stale.isdisjoint(names) for names in recommended_names]
+    relevant = set(diff.relevant_subjects)
+    candidates = [
+        i for i, student_data in enumerate(students)
+        if not flags[i] and any(subject in relevant for subject in student_data.get('subject_scores', {}))
+    ]
+    if candidates:
+        changed = _score_changes(diff, old_engine, new_engine, [students[i] for i in candidates])
+        for i, flag in zip(candidates, changed):
+            flags[i] = flag
+    return flags
+
+
+def _score_changes(diff, old_engine, new_engine, students):
+    """Per student: does an affected career score differently or sit in a tie"""
+    old_scorer = old_engine.batch_scorer
+    new_scorer = new_engine.batch_scorer
+    old_scores, _ = old_scorer.career_scores(old_scorer.subject_matrix(students))
+    new_scores, _ = new_scorer.career_scores(new_scorer.subject_matrix(students))
+
+    affected = np.zeros(len(students), dtype=bool)
+    for career in diff.affected_careers:
+        old_col = old_scorer.career_index.get(career)
+        new_col = new_scorer.career_index.get(career)
+        old_value = old_scores[:, old_col] if old_col is not None else np.zeros(len(students))
+        new_value = new_scores[:, new_col] if new_col is not None else np.zeros(len(students))
+        affected |= old_value != new_value
+
+    affected |= _tie_rows(old_scores, _affected_columns(old_scorer, diff.affected_careers))
+    affected |= _tie_rows(new_scores, _affected_columns(new_scorer, diff.affected_careers))
+    return affected.tolist()
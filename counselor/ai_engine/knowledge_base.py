@@ -1,14 +1,28 @@
+import hashlib
+import json
+
 class KnowledgeBase:
     """
     Knowledge Base containing facts, rules, and career information
     """
     
-    def __init__(self):
+    def __init__(self, careers_data=None, subjects_data=None, personality_rules=None):
         self.facts = {}
         self.rules = []
-        self.careers_data = self._initialize_careers()
-        self.subjects_data = self._initialize_subjects()
-        self.personality_rules = self._initialize_personality_rules()
+        self.careers_data = careers_data if careers_data is not None else self._initialize_careers()
+        self.subjects_data = subjects_data if subjects_data is not None else self._initialize_subjects()
+        self.personality_rules = (
+            personality_rules if personality_rules is not None else self._initialize_personality_rules()
+        )
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a knowledge base from export_state() output; missing parts use the defaults"""
+        return cls(
+            careers_data=state.get('careers'),
+            subjects_data=state.get('subjects'),
+            personality_rules=state.get('personality_rules')
+        )
     
     def _initialize_subjects(self):
         return {
@@ -139,6 +153,46 @@ class KnowledgeBase:
             'environmental': ['geography', 'biology']
         }
     
+    def export_state(self):
+        """JSON-serialisable copy of the data inference depends on"""
+        return json.loads(json.dumps({
+            'careers': self.careers_data,
+            'subjects': self.subjects_data,
+            'personality_rules': self.personality_rules,
+        }))
+    
+    def diff(self, previous_state):
+        """
+        Careers and traits that changed since ``previous_state`` (an
+        export_state() snapshot): {'added', 'removed', 'changed', 'traits'}
+        """
+        old_careers = previous_state.get('careers', {})
+        new_careers = self.export_state()['careers']
+        old_traits = previous_state.get('personality_rules', {})
+        
+        return {
+            'added': sorted(set(new_careers) - set(old_careers)),
+            'removed': sorted(set(old_careers) - set(new_careers)),
+            'changed': sorted(
+                key for key in set(old_careers) & set(new_careers)
+                if old_careers[key] != new_careers[key]
+            ),
+            'traits': sorted(
+                trait for trait in set(old_traits) | set(self.personality_rules)
+                if old_traits.get(trait) != self.personality_rules.get(trait)
+            ),
+        }
+    
+    def fingerprint(self):
+        """Stable hash of the career, subject and personality data"""
+        # sort_keys drops key order, so the career order (which breaks
+        # ranking ties) is hashed separately
+        payload = json.dumps(
+            [list(self.careers_data), self.careers_data, self.subjects_data, self.personality_rules],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
     def add_fact(self, fact_name, fact_value):
         """Add a fact to the knowledge base"""
         self.facts[fact_name] = fact_value
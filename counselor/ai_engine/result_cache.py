@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def _canonical(value):
+    """Normalise a profile value so equivalent profiles serialise identically"""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)  # 85.0 and 85 score identically
+    return value
+
+
+def _copy_record(rec):
+    """Copy of a recommendation dict and the lists inside it"""
+    return {k: list(v) if isinstance(v, list) else v for k, v in rec.items()}
+
+
+def profile_key(student_data):
+    """Canonical hash of a student_data dict"""
+    payload = json.dumps(_canonical(student_data), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class InferenceCache:
+    """
+    Thread-safe in-process LRU cache with TTL for inference results.
+
+    Every entry belongs to an engine version; seeing a different version
+    drops the whole cache, so a knowledge base or rule change can never
+    serve stale recommendations.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.version = None
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        """Return the cached value or None"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        """Store a value, evicting the least recently used entries"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, student_data, version, compute):
+        """Look up ``student_data``; on a miss run ``compute(student_data)``"""
+        key = profile_key(student_data)
+        value = self.get(key, version)
+        if value is None:
+            # Stored detached from the knowledge base's subject lists
+            value = tuple(_copy_record(rec) for rec in compute(student_data))
+            self.put(key, version, value)
+        # Hand out fresh copies so callers cannot corrupt cached entries
+        return [_copy_record(rec) for rec in value]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,110 @@
+"""
+Text form of FOPL rules, one rule per line:
+
+    STEM_Engineering_Rule [0.85]: high_score(mathematics) ∧ high_score(physics) ⇒ suitable_career(engineer)
+    Related_Rule [0.7]: high_score(?S) ∧ related(?S, ?C) ∧ ¬suitable_career(?C) ⇒ suitable_career(?C)
+
+``&`` / ``and`` may be used for ∧, ``=>`` for ⇒ and ``!`` / ``not`` for ¬.
+The confidence is optional (default 1.0); blank lines and ``#`` comments
+are ignored. format_rule() writes the same syntax back.
+"""
+import re
+
+from .fopl_rules import FOPLRule, Predicate
+
+_RULE = re.compile(r'^(?P<name>[A-Za-z_][\w.-]*)\s*(?:\[(?P<confidence>[^\]]*)\])?\s*:\s*(?P<body>.+)$')
+_IMPLIES = re.compile(r'\s*(?:⇒|=>)\s*')
+_AND = re.compile(r'\s*(?:∧|&|\band\b)\s*')
+_PREDICATE = re.compile(r'^(?P<negated>¬|!|not\s+)?\s*(?P<name>[A-Za-z_]\w*)\s*(?:\((?P<args>[^()]*)\))?$')
+
+
+class RuleSyntaxError(ValueError):
+    def __init__(self, message, line=None):
+        self.line = line
+        super().__init__(f"line {line}: {message}" if line is not None else message)
+
+
+def parse_predicate(text):
+    match = _PREDICATE.match(text.strip())
+    if match is None:
+        raise RuleSyntaxError(f"Invalid predicate {text.strip()!r}")
+    args = [arg.strip() for arg in match.group('args').split(',')] if match.group('args') else []
+    if any(not arg for arg in args):
+        raise RuleSyntaxError(f"Empty argument in {text.strip()!r}")
+    return Predicate(match.group('name'), args, negated=bool(match.group('negated')))
+
+
+def parse_rule(text):
+    """Parse one rule line into a FOPLRule"""
+    match = _RULE.match(text.strip())
+    if match is None:
+        raise RuleSyntaxError("Expected 'Name [confidence]: conditions ⇒ conclusion'")
+
+    parts = _IMPLIES.split(match.group('body'))
+    if len(parts) != 2:
+        raise RuleSyntaxError("A rule needs exactly one ⇒")
+    conditions_text, conclusion_text = parts
+
+    confidence = 1.0
+    if match.group('confidence') is not None:
+        try:
+            confidence = float(match.group('confidence'))
+        except ValueError:
+            raise RuleSyntaxError(f"Invalid confidence {match.group('confidence')!r}")
+        if not 0 <= confidence <= 1:
+            raise RuleSyntaxError("Confidence must be between 0 and 1")
+
+    conclusion = parse_predicate(conclusion_text)
+    if conclusion.negated:
+        raise RuleSyntaxError("A conclusion cannot be negated")
+
+    return FOPLRule(
+        name=match.group('name'),
+        conditions=[parse_predicate(condition) for condition in _AND.split(conditions_text)],
+        conclusion=conclusion,
+        confidence=confidence
+    )
+
+
+def parse_rules(text):
+    """Parse a rule file; errors carry the 1-based line number"""
+    rules = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        try:
+            rules.append(parse_rule(line))
+        except RuleSyntaxError as e:
+            raise RuleSyntaxError(str(e), number) from None
+    return rules
+
+
+def format_rule(rule):
+    conditions = ' ∧ '.join(str(condition) for condition in rule.conditions)
+    return f"{rule.name} [{rule.confidence}]: {conditions} ⇒ {rule.conclusion}"
+
+
+def format_rules(rules):
+    return ''.join(format_rule(rule) + '\n' for rule in rules)
+
+
+def load_rules(entries):
+    """FOPLRules from a state's rule list, whose items are dicts or rule lines"""
+    rules = []
+    for number, entry in enumerate(entries, 1):
+        if isinstance(entry, str):
+            try:
+                rules.append(parse_rule(entry))
+            except RuleSyntaxError as e:
+                raise RuleSyntaxError(f"rule {number}: {e}") from None
+        else:
+            rules.append(FOPLRule.from_dict(entry))
+    return rules
+
+
+def normalize_state(state):
+    """Copy of an engine state with every rule in dict form"""
+    if 'rules' not in state:
+        return dict(state)
+    return dict(state, rules=[rule.to_dict() for rule in load_rules(state['rules'])])
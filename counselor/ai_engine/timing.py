@@ -0,0 +1,150 @@
+"""
+Lightweight phase timing: spans, per-request collection and in-process
+latency histograms.
+
+``with span('inference'):`` always feeds the phase's histogram; while a
+request collection is active (see ServerTimingMiddleware) the duration
+is also recorded for that request's Server-Timing header. The active
+collection lives in a context variable, so spans inside sync_to_async
+threads and coroutines attribute to the right request. Standard library
+only, so the engine can time its own phases.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Bucket upper bounds in milliseconds: 0.05ms doubling every two buckets up to ~105s
+BUCKET_BOUNDS = tuple(0.05 * 2 ** (i / 2) for i in range(43))
+
+_current = ContextVar('counselor_timing_spans', default=None)
+
+
+class PhaseHistogram:
+    """Thread-safe latency histogram over fixed logarithmic buckets"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # Last bucket is overflow
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        index = _bucket(ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-quantile, capped at the max
+        seen; overestimates by at most the bucket ratio (sqrt 2)
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank and count:
+                    break
+            bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max_ms
+            return min(bound, self.max_ms)
+
+    def summary(self):
+        with self._lock:
+            count, total_ms, max_ms = self.count, self.total_ms, self.max_ms
+        return {
+            'count': count,
+            'mean_ms': round(total_ms / count, 3) if count else None,
+            'p50_ms': _round(self.quantile(0.5)),
+            'p90_ms': _round(self.quantile(0.9)),
+            'p99_ms': _round(self.quantile(0.99)),
+            'max_ms': round(max_ms, 3),
+        }
+
+
+def _bucket(ms):
+    # Binary search over the bounds; the overflow bucket catches the rest
+    lo, hi = 0, len(BUCKET_BOUNDS)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if ms <= BUCKET_BOUNDS[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(name):
+    """The process-wide histogram of a phase, created on first use"""
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, PhaseHistogram())
+    return hist
+
+
+def record(name, seconds):
+    """Record a measured phase duration"""
+    ms = seconds * 1000.0
+    histogram(name).observe(ms)
+    spans = _current.get()
+    if spans is not None:
+        spans.append((name, ms))
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as phase ``name``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def begin():
+    """Start collecting spans for the current request; returns a token for end()"""
+    return _current.set([])
+
+
+def end(token):
+    """Stop collecting and return the request's [(name, ms)] in completion order"""
+    spans = _current.get()
+    _current.reset(token)
+    return spans or []
+
+
+def server_timing(spans):
+    """Server-Timing header value; repeated phases are summed"""
+    totals = {}
+    for name, ms in spans:
+        totals[name] = totals.get(name, 0.0) + ms
+    return ', '.join(f"{name};dur={ms:.2f}" for name, ms in totals.items())
+
+
+def snapshot():
+    """Summary of every phase histogram, by phase name"""
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    return {name: hist.summary() for name, hist in items}
+
+
+def reset():
+    """Drop all histograms"""
+    with _histograms_lock:
+        _histograms.clear()
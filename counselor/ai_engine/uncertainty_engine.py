@@ -1,3 +1,7 @@
+UNCERTAINTY_DISCOUNT = 0.15  # General reduction applied to every score
+UNCERTAINTY_LEVELS = ('Low', 'Medium', 'High')  # uncertainty_level codes of adjust_batch()
+
+
 class UncertaintyEngine:
     """
     Handles uncertainty in career recommendations using certainty factors
@@ -27,8 +31,7 @@ class UncertaintyEngine:
             adjusted_score = adjusted_score * (1 - variance_penalty)
             
             # Apply general uncertainty discount (10-20% reduction)
-            uncertainty_discount = 0.15  # Reduce by 15% to account for uncertainty
-            adjusted_score = adjusted_score * (1 - uncertainty_discount)
+            adjusted_score = adjusted_score * (1 - UNCERTAINTY_DISCOUNT)
             
             # Ensure score stays in reasonable range (40-90)
             final_score = max(40, min(90, adjusted_score))
@@ -42,6 +45,36 @@ class UncertaintyEngine:
         
         return sorted(adjusted_recommendations, key=lambda x: x['confidence_score'], reverse=True)
     
+    def adjust_batch(self, base_confidences, required_counts):
+        """
+        Vectorised apply_uncertainty_to_recommendations for arrays of base
+        confidence scores (0-100) and required subject counts, which are
+        broadcast together. Returns a structured array of that shape with
+        fields confidence_score (int64) and uncertainty_level (uint8 index
+        into UNCERTAINTY_LEVELS); the arithmetic matches the scalar path
+        operation for operation. Re-sorting is left to the caller.
+        """
+        import numpy as np
+        
+        base = np.asarray(base_confidences, dtype=np.float64)
+        counts = np.asarray(required_counts)
+        base, counts = np.broadcast_arrays(base, counts)
+        
+        # Same penalties as _calculate_data_penalty/_calculate_variance_penalty
+        data_penalty = np.where(counts >= 3, 0.05, np.where(counts >= 2, 0.15, 0.25))
+        variance_penalty = np.where(base > 85, 0.20, np.where(base > 70, 0.10, 0.05))
+        
+        adjusted = base * (1 - data_penalty)
+        adjusted = adjusted * (1 - variance_penalty)
+        adjusted = adjusted * (1 - UNCERTAINTY_DISCOUNT)
+        final_score = np.maximum(40, np.minimum(90, adjusted))
+        
+        result = np.empty(base.shape, dtype=[('confidence_score', np.int64), ('uncertainty_level', np.uint8)])
+        result['confidence_score'] = np.trunc(final_score)
+        # Same buckets as _categorize_uncertainty, on the unrounded score
+        result['uncertainty_level'] = np.where(final_score >= 75, 0, np.where(final_score >= 60, 1, 2))
+        return result
+    
     def _calculate_data_penalty(self, recommendation):
         """Calculate penalty for incomplete data (0.0-0.3)"""
         required_subjects = recommendation.get('required_subjects', [])
@@ -0,0 +1,137 @@
+"""
+Unification over first-order facts.
+
+Terms are plain values; strings starting with '?' are variables, so
+``related(?S, ?C)`` is ``Predicate("related", ["?S", "?C"])``. Facts are
+ground (name, args) pairs held in a FactStore, hash-indexed by predicate
+name and first argument: a goal whose first argument is bound is answered
+with one dict lookup instead of a scan over every fact.
+"""
+
+_UNBOUND = object()
+
+
+def is_variable(term):
+    return isinstance(term, str) and term.startswith('?')
+
+
+def resolve(term, bindings):
+    """Follow variable bindings down to a value or an unbound variable"""
+    while is_variable(term) and term in bindings:
+        term = bindings[term]
+    return term
+
+
+def substitute(args, bindings):
+    """Args with every bound variable replaced by its value"""
+    return tuple(resolve(term, bindings) for term in args)
+
+
+def unify(left, right, bindings=None):
+    """
+    Most general bindings making two argument lists equal, extending
+    ``bindings`` (which is never modified), or None if they clash
+    """
+    bindings = {} if bindings is None else bindings
+    if len(left) != len(right):
+        return None
+
+    result = bindings
+    for a, b in zip(left, right):
+        a = resolve(a, result)
+        b = resolve(b, result)
+        if a == b:
+            continue
+        if result is bindings:
+            result = dict(bindings)
+        if is_variable(a):
+            result[a] = b
+        elif is_variable(b):
+            result[b] = a
+        else:
+            return None
+    return result
+
+
+class FactStore:
+    """
+    Ground facts indexed by name and by (name, first argument).
+
+    A store can be layered over a parent (e.g. per-student facts over the
+    shared knowledge base facts); lookups see both, additions only touch
+    the child.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self._facts = set()
+        self._by_name = {}  # name -> [args]
+        self._by_first = {}  # (name, first arg) -> [args]
+
+    def __len__(self):
+        return len(self._facts) + (len(self.parent) if self.parent is not None else 0)
+
+    def __contains__(self, fact):
+        return fact in self._facts or (self.parent is not None and fact in self.parent)
+
+    def add(self, name, args=()):
+        """Add a ground fact; returns False if it was already known"""
+        args = tuple(args)
+        fact = (name, args)
+        if fact in self:
+            return False
+        self._facts.add(fact)
+        self._by_name.setdefault(name, []).append(args)
+        if args:
+            self._by_first.setdefault((name, args[0]), []).append(args)
+        return True
+
+    def candidates(self, name, first=_UNBOUND):
+        """Args of the facts called ``name``, narrowed to a first argument if given"""
+        if self.parent is not None:
+            yield from self.parent.candidates(name, first)
+        if first is _UNBOUND:
+            yield from self._by_name.get(name, ())
+        else:
+            yield from self._by_first.get((name, first), ())
+
+    def query(self, predicate, bindings=None):
+        """Yield the bindings of every fact matching a positive predicate"""
+        bindings = {} if bindings is None else bindings
+        args = substitute(predicate.args, bindings)
+        first = args[0] if args and not is_variable(args[0]) else _UNBOUND
+        for fact_args in self.candidates(predicate.name, first):
+            extended = unify(args, fact_args, bindings)
+            if extended is not None:
+                yield extended
+
+
+def solve(conditions, store, bindings=None):
+    """
+    Yield every set of bindings satisfying all conditions against the
+    store. Conditions are joined left to right; a negated condition is
+    negation as failure and is tested as soon as its variables are bound.
+    """
+    return _solve(list(conditions), store, {} if bindings is None else bindings)
+
+
+def _solve(goals, store, bindings):
+    if not goals:
+        yield bindings
+        return
+
+    for i, goal in enumerate(goals):
+        rest = goals[:i] + goals[i + 1:]
+        if goal.negated:
+            args = substitute(goal.args, bindings)
+            if any(is_variable(term) for term in args):
+                continue  # Wait until a positive goal binds its variables
+            if (goal.name, args) not in store:
+                yield from _solve(rest, store, bindings)
+            return
+
+        for extended in store.query(goal, bindings):
+            yield from _solve(rest, store, extended)
+        return
+
+    raise ValueError(f"Unsafe negation: {[str(goal) for goal in goals]} never become ground")
@@ -0,0 +1,96 @@
+"""
+Bitset working memory for ground FOPL rules.
+
+Every ground fact a rule can test owns one bit of an int: high_score(S)
+and good_score(S) for the subjects rules look at, personality_trait(T)
+for each trait and suitable_career(C) for each career. A student's
+working memory is then a single int built without per-fact allocations,
+and a rule's conditions compile to bit masks, so counting its satisfied
+conditions is an AND and a popcount per mask.
+"""
+
+HIGH_SCORE = 75  # high_score(S) threshold
+GOOD_SCORE = 65  # good_score(S) threshold
+
+SCORE_PREDICATES = ('high_score', 'good_score')
+FACT_PREDICATES = SCORE_PREDICATES + ('personality_trait', 'suitable_career')
+
+
+class FactLayout:
+    """Bit assignment for the ground facts of one rule set"""
+
+    def __init__(self, rules, traits, careers):
+        self.bits = {}  # (predicate name, argument) -> bit mask
+        self.facts = []  # bit index -> (predicate name, argument)
+
+        for rule in rules:
+            for condition in rule.conditions:
+                if condition.name in FACT_PREDICATES and condition.args:
+                    self._assign(condition.name, condition.args[0])
+        for trait in traits:
+            self._assign('personality_trait', trait)
+        for career in careers:
+            self._assign('suitable_career', career)
+        for rule in rules:
+            if rule.conclusion.args:
+                self._assign('suitable_career', rule.conclusion.args[0])
+
+        # (subject, high bit, good bit) for every subject a rule tests
+        subjects = {}
+        for (name, arg), bit in self.bits.items():
+            if name in SCORE_PREDICATES:
+                high, good = subjects.get(arg, (0, 0))
+                subjects[arg] = (high | bit, good) if name == 'high_score' else (high, good | bit)
+        self.score_tests = tuple((subject, high, good) for subject, (high, good) in subjects.items())
+
+    def _assign(self, name, arg):
+        key = (name, arg)
+        if key not in self.bits:
+            self.bits[key] = 1 << len(self.facts)
+            self.facts.append(key)
+
+    def bit(self, name, arg):
+        """Mask of one fact, 0 if no rule can test it"""
+        return self.bits.get((name, arg), 0)
+
+    def encode_scores(self, subject_scores):
+        """high_score/good_score bits of one student"""
+        bits = 0
+        for subject, high, good in self.score_tests:
+            score = subject_scores.get(subject)
+            if score is None:
+                continue
+            if score >= HIGH_SCORE:
+                bits |= high
+            if score >= GOOD_SCORE:
+                bits |= good
+        return bits
+
+    def compile_conditions(self, conditions):
+        """
+        Masks whose popcounts against a working memory sum to the number
+        of satisfied conditions. A condition listed n times is counted n
+        times, so repeated bits spill into additional masks; conditions no
+        fact can satisfy get no bit.
+        """
+        counts = {}
+        for condition in conditions:
+            bit = self.bit(condition.name, condition.args[0]) if condition.args else 0
+            if bit:
+                counts[bit] = counts.get(bit, 0) + 1
+
+        masks = []
+        while counts:
+            mask = 0
+            for bit in counts:
+                mask |= bit
+            masks.append(mask)
+            counts = {bit: count - 1 for bit, count in counts.items() if count > 1}
+        return tuple(masks)
+
+    def describe(self, bits):
+        """Facts set in a working memory, for debugging"""
+        return [
+            f"{name}({arg})" for index, (name, arg) in enumerate(self.facts)
+            if bits >> index & 1
+        ]
@@ -4,12 +4,17 @@ class CounselorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'counselor'
     verbose_name = 'AI Career Counselor'
-    
+
     def ready(self):
-        # Initialize AI components when app starts
-        from .ai_engine.knowledge_base import KnowledgeBase
-        from .ai_engine.fopl_rules import FOPLRuleEngine
-        
-        # Pre-load knowledge base for better performance
-        kb = KnowledgeBase()
-        fopl_engine = FOPLRuleEngine(kb)
+        # Build the shared inference engine once per worker process so
+        # requests never pay for knowledge base / rule construction
+        from django.conf import settings
+        from .ai_engine.career_engine import get_engine, inference_cache
+        from .ai_engine.fallback_engine import fallback_engine
+
+        cache_settings = getattr(settings, 'COUNSELOR_INFERENCE_CACHE', {})
+        for cache in (inference_cache, fallback_engine.cache):
+            cache.maxsize = cache_settings.get('MAXSIZE', cache.maxsize)
+            cache.ttl = cache_settings.get('TTL', cache.ttl)
+
+        get_engine()
@@ -0,0 +1,96 @@
+"""
+Helpers for the async views: a bounded executor for CPU-bound inference
+and async-aware replacements for decorators that, in Django 4.2, only
+wrap sync views.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+
+
+class InferenceBusy(Exception):
+    """The inference executor has no free slot"""
+
+
+class InferenceExecutor:
+    """
+    Thread pool that runs inference for async views off the event loop.
+
+    At most COUNSELOR_INFERENCE_THREADS calls run at once and at most
+    COUNSELOR_INFERENCE_QUEUE more wait; beyond that run() raises
+    InferenceBusy so views shed load instead of queueing without bound.
+    A slot is only freed when its call finishes, even if the request
+    that submitted it was cancelled.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _limits(self):
+        workers = getattr(settings, 'COUNSELOR_INFERENCE_THREADS', 4)
+        return workers, workers + getattr(settings, 'COUNSELOR_INFERENCE_QUEUE', 32)
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn, *args):
+        """Await fn(*args) on the pool"""
+        workers, capacity = self._limits()
+        with self._lock:
+            if self._in_flight >= capacity:
+                raise InferenceBusy()
+            self._in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+        try:
+            # Carry context variables (e.g. the request's timing spans) into the thread
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': self._in_flight, 'limits': self._limits()}
+
+
+inference_executor = InferenceExecutor()
+
+
+def _load_user(request):
+    # request.user is lazy; touching it runs the session/auth queries
+    request.user.is_authenticated
+    return request.user
+
+
+async def aget_user(request):
+    """request.user, loaded from the session in a thread"""
+    return await sync_to_async(_load_user)(request)
+
+
+def async_login_required(view_func):
+    """login_required for async views"""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        user = await aget_user(request)
+        if user.is_authenticated:
+            return await view_func(request, *args, **kwargs)
+        return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+    return wrapper
+
+
+def async_csrf_exempt(view_func):
+    """csrf_exempt for async views (the 4.2 decorator wraps it in a sync function)"""
+    view_func.csrf_exempt = True
+    return view_func
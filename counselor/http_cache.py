@@ -0,0 +1,110 @@
+"""
+Rendered-page cache and validators for the results page.
+
+A results page only changes when its assessment is (re)scored, so the
+page is cached per session_id and viewer (the navbar shows the user) and
+revalidated with a strong ETag / Last-Modified derived from the
+assessment's scoring timestamp. Hits skip both the ORM and the template
+engine; save_recommendations evicts the entry when an assessment is
+re-scored.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+from .models import StudentAssessment
+
+
+def _meta_key(session_id):
+    return f"counselor:results:{session_id}"
+
+
+def _page_key(session_id, etag):
+    return f"counselor:results:{session_id}:{hashlib.sha1(etag.encode()).hexdigest()}"
+
+
+def _timeout():
+    return getattr(settings, 'COUNSELOR_RESULTS_CACHE_TIMEOUT', 3600)
+
+
+def viewer_variant(request):
+    """Cache variant for the current viewer"""
+    user = request.user
+    return str(user.pk) if user.is_authenticated else 'anon'
+
+
+def assessment_validators(assessment):
+    """Version stamp and Last-Modified datetime of an assessment's results"""
+    modified = assessment.scored_at or assessment.created_at
+    return modified.isoformat(), modified
+
+
+def _stamp(row):
+    # Same stamp as assessment_validators() for a (scored_at, created_at) row
+    return (row[0] or row[1]).isoformat() if row else None
+
+
+def _stamp_row(session_id):
+    return StudentAssessment.objects.filter(session_id=session_id).values_list('scored_at', 'created_at')
+
+
+def results_etag(session_id, stamp, variant):
+    """Strong ETag for one rendering of a results page"""
+    digest = hashlib.sha1(f"{session_id}:{stamp}:{variant}".encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def get_validators(session_id):
+    """Cached (stamp, last_modified timestamp) for a session, or None"""
+    return cache.get(_meta_key(session_id))
+
+
+def get_page(session_id, etag):
+    """Cached rendered content for this ETag, or None"""
+    return cache.get(_page_key(session_id, etag))
+
+
+def store_page(session_id, stamp, last_modified, etag, content):
+    """
+    Cache a rendered page. A re-score committed while it rendered may
+    already have run its invalidate(), so the committed stamp is checked
+    after writing: either the check sees the new stamp, or the re-score's
+    invalidate() runs after this write.
+    """
+    timeout = _timeout()
+    cache.set_many({
+        _meta_key(session_id): (stamp, last_modified),
+        _page_key(session_id, etag): content,
+    }, timeout)
+    if _stamp(_stamp_row(session_id).first()) != stamp:
+        invalidate(session_id)
+
+
+# Async variants for async views
+
+async def aget_validators(session_id):
+    return await cache.aget(_meta_key(session_id))
+
+
+async def aget_page(session_id, etag):
+    return await cache.aget(_page_key(session_id, etag))
+
+
+async def astore_page(session_id, stamp, last_modified, etag, content):
+    await cache.aset_many({
+        _meta_key(session_id): (stamp, last_modified),
+        _page_key(session_id, etag): content,
+    }, _timeout())
+    if _stamp(await _stamp_row(session_id).afirst()) != stamp:
+        await ainvalidate(session_id)
+
+
+async def ainvalidate(session_id):
+    await cache.adelete(_meta_key(session_id))
+
+
+def invalidate(session_id):
+    """Forget the cached validators; page entries keyed by old ETags age out"""
+    cache.delete(_meta_key(session_id))
@@ -0,0 +1,151 @@
+"""
+Asynchronous assessment scoring on a local worker pool.
+
+With COUNSELOR_ASYNC_ASSESSMENTS on, the assessment form only stores the
+assessment and an InferenceJob row and redirects; worker threads in the
+same process claim pending jobs, run the inference pipeline and save the
+recommendations while the results page polls for them. The job table is
+the queue, so no broker is needed and queued work survives restarts:
+idle workers re-check the table every COUNSELOR_JOB_POLL_INTERVAL
+seconds, jobs whose worker died are re-queued after
+COUNSELOR_JOB_TIMEOUT, and the process_inference_jobs command can drain
+the queue from a separate process.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .ai_engine.timing import span
+from .models import InferenceJob
+from .recommendation_store import save_recommendation_sets
+
+MAX_ATTEMPTS = 3  # Runs of a job before it is marked failed
+CLAIM_BATCH = 10  # Pending jobs looked at per claim attempt
+
+
+def async_enabled():
+    """True when assessments are scored by the worker pool"""
+    return getattr(settings, 'COUNSELOR_ASYNC_ASSESSMENTS', False)
+
+
+def poll_interval():
+    """Seconds between queue checks of idle workers and results page polls"""
+    return getattr(settings, 'COUNSELOR_JOB_POLL_INTERVAL', 2)
+
+
+def enqueue(assessment):
+    """Queue scoring of a saved assessment; workers are woken after commit"""
+    job = InferenceJob.objects.create(assessment=assessment)
+    transaction.on_commit(pool.wake)
+    return job
+
+
+def requeue_stale():
+    """Put back jobs whose worker died mid-run, failing them after MAX_ATTEMPTS"""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'COUNSELOR_JOB_TIMEOUT', 300))
+    stale = InferenceJob.objects.filter(status=InferenceJob.RUNNING, started_at__lt=cutoff)
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=InferenceJob.FAILED, error='Timed out', finished_at=now
+    )
+    stale.filter(attempts__lt=MAX_ATTEMPTS).update(status=InferenceJob.PENDING)
+
+
+def claim():
+    """
+    Claim the oldest pending job, or return None. The claim is an UPDATE
+    conditional on the job still being pending, so it is atomic across
+    threads and processes on any database.
+    """
+    pending = (
+        InferenceJob.objects.filter(status=InferenceJob.PENDING)
+        .order_by('created_at', 'pk').values_list('pk', flat=True)[:CLAIM_BATCH]
+    )
+    for pk in pending:
+        claimed = InferenceJob.objects.filter(pk=pk, status=InferenceJob.PENDING).update(
+            status=InferenceJob.RUNNING, started_at=timezone.now(), attempts=F('attempts') + 1
+        )
+        if claimed:
+            return InferenceJob.objects.select_related('assessment').get(pk=pk)
+    return None
+
+
+def run(job):
+    """Score a claimed job's assessment and record the outcome"""
+    from .views import score_assessment
+
+    try:
+        recommendations = score_assessment(job.assessment)
+        with span('save'), transaction.atomic():
+            save_recommendation_sets([(job.assessment, recommendations)])
+            InferenceJob.objects.filter(pk=job.pk).update(
+                status=InferenceJob.DONE, error='', finished_at=timezone.now()
+            )
+    except Exception as e:
+        print(f"Inference job {job.pk} failed (attempt {job.attempts}): {e}")
+        if job.attempts < MAX_ATTEMPTS:
+            InferenceJob.objects.filter(pk=job.pk).update(status=InferenceJob.PENDING, error=str(e))
+        else:
+            InferenceJob.objects.filter(pk=job.pk).update(
+                status=InferenceJob.FAILED, error=str(e), finished_at=timezone.now()
+            )
+
+
+def drain():
+    """Run queued jobs until none is pending; returns how many ran"""
+    requeue_stale()
+    count = 0
+    while True:
+        job = claim()
+        if job is None:
+            return count
+        run(job)
+        count += 1
+
+
+class WorkerPool:
+    """
+    COUNSELOR_JOB_WORKERS daemon threads draining the job table, started
+    on first use in a process. A worker killed with its process leaves
+    its job running until requeue_stale() hands it to another one.
+    """
+
+    def __init__(self):
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def start(self):
+        """Start the workers if this process has none yet"""
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(getattr(settings, 'COUNSELOR_JOB_WORKERS', 2)):
+                thread = threading.Thread(target=self._work, name=f'inference-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def wake(self):
+        """Have an idle worker check the queue now"""
+        self.start()
+        self._wakeup.set()
+
+    def _work(self):
+        while True:
+            close_old_connections()
+            try:
+                drain()
+            except DatabaseError as e:
+                print(f"Inference worker error: {e}")
+            close_old_connections()
+            self._wakeup.wait(poll_interval())
+            self._wakeup.clear()
+
+
+pool = WorkerPool()
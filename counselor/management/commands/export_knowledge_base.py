@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from counselor import rulesets
+from counselor.ai_engine.rule_dsl import format_rule
+
+
+class Command(BaseCommand):
+    help = (
+        'Write the live knowledge base and rules to a JSON file '
+        '(baseline for rescore_assessments --baseline, or input for load_ruleset)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the JSON file to write')
+        parser.add_argument(
+            '--dsl',
+            action='store_true',
+            help='Write rules as rule DSL lines instead of JSON objects',
+        )
+
+    def handle(self, *args, **options):
+        engine = rulesets.refresh(force=True)
+        state = engine.export_state()
+        if options['dsl']:
+            state['rules'] = [format_rule(rule) for rule in engine.fopl_engine.rules]
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(state, fh, indent=2, ensure_ascii=False)
+        version = f'rule set v{engine.ruleset_version}' if engine.ruleset_version else 'built-in rules'
+        self.stdout.write(self.style.SUCCESS(f"Exported engine {engine.version} ({version}) to {options['output']}"))
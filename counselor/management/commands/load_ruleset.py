@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from counselor import rulesets
+from counselor.ai_engine.rule_dsl import parse_rules
+
+
+class Command(BaseCommand):
+    help = (
+        'Publish a new rule set version from a JSON engine state (see export_knowledge_base) '
+        'or a .rules file; running workers switch to it within COUNSELOR_RULESET_CHECK_INTERVAL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='JSON state (careers, subjects, personality_rules, rules) or a rule DSL file ending in .rules',
+        )
+        parser.add_argument('--comment', default='', help='Note stored with the version')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only parse and compile the rule set',
+        )
+
+    def _read_state(self, path):
+        try:
+            with open(path, encoding='utf-8') as fh:
+                text = fh.read()
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+        try:
+            if path.endswith('.rules'):
+                # Rules only: careers and subjects come from the live rule set
+                state = rulesets.refresh(force=True).export_state()
+                state['rules'] = [rule.to_dict() for rule in parse_rules(text)]
+                return state
+            state = json.loads(text)
+        except ValueError as e:
+            raise CommandError(f'{path}: {e}')
+        if not isinstance(state, dict):
+            raise CommandError(f'{path}: expected a JSON object')
+        return state
+
+    def handle(self, *args, **options):
+        state = self._read_state(options['path'])
+
+        if options['dry_run']:
+            from counselor.ai_engine.career_engine import CareerInferenceEngine
+
+            try:
+                engine = CareerInferenceEngine.from_state(state)
+            except (ValueError, KeyError, TypeError) as e:
+                raise CommandError(f'Invalid rule set: {e}')
+            self.stdout.write(self.style.SUCCESS(
+                f'Rule set OK: {len(engine.kb.careers_data)} careers, '
+                f'{len(engine.fopl_engine.rules)} rules (engine {engine.version})'
+            ))
+            return
+
+        try:
+            ruleset, engine = rulesets.publish(state, options['comment'])
+        except (ValueError, KeyError, TypeError) as e:
+            raise CommandError(f'Invalid rule set: {e}')
+        except IntegrityError:
+            raise CommandError('Another rule set was published concurrently; run the command again')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Published rule set v{ruleset.version}: {len(engine.kb.careers_data)} careers, '
+            f'{len(engine.fopl_engine.rules)} rules (engine {engine.version})'
+        ))
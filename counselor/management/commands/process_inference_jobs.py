@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from counselor import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Score queued assessments (COUNSELOR_ASYNC_ASSESSMENTS) outside the web processes; '
+        'runs until interrupted unless --once is given'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            close_old_connections()
+            try:
+                count = jobs.drain()
+            except DatabaseError as e:
+                self.stderr.write(f'Queue check failed: {e}')
+                count = 0
+            if count:
+                total += count
+                self.stdout.write(f'Processed {count} inference jobs ({total} total)')
+            if options['once']:
+                break
+            time.sleep(jobs.poll_interval())
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} inference jobs'))
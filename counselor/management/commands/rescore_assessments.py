@@ -0,0 +1,272 @@
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from counselor import rulesets
+from counselor.ai_engine.career_engine import get_engine
+from counselor.ai_engine.kb_diff import EngineDiff
+from counselor.models import CareerRecommendation, StudentAssessment
+from counselor.recommendation_store import save_recommendation_sets
+
+
+_baseline = None
+
+
+def _init_worker(baseline_state=None):
+    # Spawned (non-fork) workers start without Django configured
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    # Score with the live rule set, not the built-in rules
+    from counselor import rulesets
+
+    rulesets.refresh(force=True)
+
+    global _baseline
+    if baseline_state is not None:
+        from counselor.ai_engine.career_engine import CareerInferenceEngine, get_engine
+        from counselor.ai_engine.kb_diff import EngineDiff
+
+        _baseline = (
+            CareerInferenceEngine.from_state(baseline_state),
+            EngineDiff(baseline_state, get_engine().export_state()),
+        )
+
+
+def _noop():
+    return None
+
+
+def score_chunk(students, recommended_names=None):
+    """
+    Worker entry point: score a list of (pk, student_data) with the batch
+    scorer and return (pk, recommendations) pairs. With a baseline loaded,
+    only students whose results can change are scored and returned.
+    """
+    from counselor.ai_engine.career_engine import get_engine
+
+    engine = get_engine()
+    if _baseline is not None:
+        from counselor.ai_engine.kb_diff import affected_students
+
+        old_engine, diff = _baseline
+        flags = affected_students(
+            diff, old_engine, engine,
+            [student_data for _, student_data in students], recommended_names
+        )
+        students = [student for student, flag in zip(students, flags) if flag]
+        if not students:
+            return []
+    batch = engine.recommend_batch([student_data for _, student_data in students])
+    return [(pk, recommendations) for (pk, _), recommendations in zip(students, batch)]
+
+
+class Command(BaseCommand):
+    help = 'Recompute recommendations for existing assessments after rule or knowledge base changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only re-score assessments created on or after this date/datetime (ISO format)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Assessments per database fetch, worker task and bulk write',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of inference worker processes',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording the last re-scored assessment id, updated after every chunk',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the assessment id stored in --checkpoint',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Knowledge base JSON written by export_knowledge_base before the change; '
+                 'only assessments whose recommendations can differ are rewritten',
+        )
+
+    def _parse_since(self, value):
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f'Invalid --since value: {value}')
+            since = datetime(day.year, day.month, day.day)
+        if timezone.is_naive(since) and timezone.is_aware(timezone.now()):
+            since = timezone.make_aware(since)
+        return since
+
+    def _read_checkpoint(self, path):
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            raise CommandError(f'Checkpoint file {path} is corrupt')
+
+    def _write_checkpoint(self, path, state):
+        # Write-then-rename so an interrupted run never leaves a torn file
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, path)
+
+    def _read_baseline(self, path):
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read baseline {path}: {e}')
+
+    def _candidates(self, diff):
+        """
+        Assessments that can be affected by ``diff``: those scored in a
+        relevant subject and those currently listing a stale career; the
+        workers narrow these down further (see kb_diff.affected_students)
+        """
+        lists_stale = Exists(CareerRecommendation.objects.filter(
+            assessment=OuterRef('pk'), career__name__in=diff.stale_names
+        ))
+        if not diff.relevant_subjects:
+            return Q(lists_stale)
+        return Q(subject_scores__has_any_keys=diff.relevant_subjects) | Q(lists_stale)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = max(1, options['workers'])
+        checkpoint_path = options['checkpoint']
+        if options['resume'] and not checkpoint_path:
+            raise CommandError('--resume requires --checkpoint')
+
+        rulesets.refresh(force=True)
+
+        baseline_state = None
+        diff = None
+        if options['baseline']:
+            baseline_state = self._read_baseline(options['baseline'])
+            diff = EngineDiff(baseline_state, get_engine().export_state())
+            self.stdout.write(f'Baseline diff: {diff.summary()}')
+            if diff.is_empty():
+                self.stdout.write(self.style.SUCCESS('No career is affected; nothing to re-score'))
+                return
+
+        fields = [
+            'id', 'session_id', 'subject_scores', 'personality_traits',
+            'career_interests', 'age', 'education_level'
+        ]
+        if baseline_state is not None:
+            fields.append('recommendation_snapshot')
+        queryset = StudentAssessment.objects.only(*fields).order_by('pk')
+        if options['since']:
+            queryset = queryset.filter(created_at__gte=self._parse_since(options['since']))
+        if diff is not None and diff.relevant_subjects is not None:
+            queryset = queryset.filter(self._candidates(diff))
+
+        state = {'last_id': None, 'processed': 0}
+        if options['resume']:
+            state.update(self._read_checkpoint(checkpoint_path))
+            if state['last_id'] is not None:
+                queryset = queryset.filter(pk__gt=state['last_id'])
+                self.stdout.write(f"Resuming after assessment {state['last_id']}")
+
+        total = queryset.count()
+        self.stdout.write(self.style.SUCCESS(f'Re-scoring {total} assessments with {workers} workers...'))
+        if not total:
+            return
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+
+        processed = 0
+        rewritten = 0
+        recommendations_saved = 0
+        started = time.monotonic()
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(baseline_state,)
+        ) as executor:
+            # Start the workers before the streaming cursor is opened
+            executor.submit(_noop).result()
+
+            # Futures are consumed in submission order, which keeps the
+            # checkpoint contiguous; the window bounds memory use
+            pending = deque()
+            window = workers * 2
+
+            def drain_one():
+                nonlocal processed, rewritten, recommendations_saved
+                assessments, future = pending.popleft()
+                scored = dict(future.result())
+                recommendations_saved += save_recommendation_sets(
+                    [(assessment, scored[assessment.pk]) for assessment in assessments if assessment.pk in scored]
+                )
+                rewritten += len(scored)
+                processed += len(assessments)
+                state['last_id'] = assessments[-1].pk
+                state['processed'] += len(assessments)
+                if checkpoint_path:
+                    self._write_checkpoint(checkpoint_path, state)
+
+                elapsed = time.monotonic() - started
+                rate = processed / elapsed if elapsed else 0
+                remaining = (total - processed) / rate if rate else 0
+                self.stdout.write(
+                    f'{processed}/{total} assessments ({processed * 100 // total}%), '
+                    f'{rate:.0f}/s, ~{remaining:.0f}s remaining'
+                )
+
+            def submit(chunk):
+                students = [(a.pk, a.to_student_data()) for a in chunk]
+                names = None
+                if baseline_state is not None:
+                    names = [
+                        {rec.get('career_name') for rec in a.recommendation_snapshot or []}
+                        for a in chunk
+                    ]
+                pending.append((chunk, executor.submit(score_chunk, students, names)))
+
+            chunk = []
+            for assessment in queryset.iterator(chunk_size=chunk_size):
+                chunk.append(assessment)
+                if len(chunk) >= chunk_size:
+                    submit(chunk)
+                    chunk = []
+                    if len(pending) >= window:
+                        drain_one()
+            if chunk:
+                submit(chunk)
+            while pending:
+                drain_one()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Re-scoring complete! Assessments: {processed}, Rewritten: {rewritten}, '
+                f'Recommendations: {recommendations_saved}, '
+                f'Time: {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.0f}/s)'
+            )
+        )
@@ -0,0 +1,79 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from . import rulesets
+from .ai_engine import timing
+
+
+class RuleSetReloadMiddleware:
+    """
+    Picks up newly published rule sets between requests (see rulesets.refresh);
+    the version check is throttled, so most requests do no extra work.
+    Async-capable, so it does not force async views onto a thread.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        rulesets.refresh()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Only hop to a thread when the throttled check is due
+        if rulesets.refresh_due():
+            await sync_to_async(rulesets.refresh)()
+        return await self.get_response(request)
+
+
+class ServerTimingMiddleware:
+    """
+    Collects the phase spans of each request (see ai_engine.timing) and
+    records the whole request as the 'total' phase. With
+    COUNSELOR_SERVER_TIMING on, the spans are also sent back in a
+    Server-Timing header. Goes first in MIDDLEWARE so 'total' covers the
+    rest of the stack.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.emit_header = getattr(settings, 'COUNSELOR_SERVER_TIMING', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = timing.begin()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.record('total', time.perf_counter() - start)
+            spans = timing.end(token)
+        return self._finish(response, spans)
+
+    async def __acall__(self, request):
+        token = timing.begin()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.record('total', time.perf_counter() - start)
+            spans = timing.end(token)
+        return self._finish(response, spans)
+
+    def _finish(self, response, spans):
+        if self.emit_header:
+            response['Server-Timing'] = timing.server_timing(spans)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0004_careerrecommendation_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentassessment',
+            name='recommendation_snapshot',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0005_studentassessment_recommendation_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentassessment',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
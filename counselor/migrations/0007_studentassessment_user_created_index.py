@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0006_studentassessment_scored_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentassessment',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='assessment_user_created_idx'),
+        ),
+    ]
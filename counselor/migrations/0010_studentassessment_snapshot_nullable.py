@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:46
+
+from django.db import migrations, models
+
+
+def mark_unbuilt_snapshots(apps, schema_editor):
+    # Every save sets scored_at with the snapshot, so an empty snapshot
+    # without scored_at was never built (saved before snapshots existed,
+    # or not scored yet) rather than scored with no recommendations
+    StudentAssessment = apps.get_model('counselor', 'StudentAssessment')
+    StudentAssessment.objects.filter(recommendation_snapshot=[], scored_at__isnull=True).update(
+        recommendation_snapshot=None
+    )
+
+
+def unmark_unbuilt_snapshots(apps, schema_editor):
+    StudentAssessment = apps.get_model('counselor', 'StudentAssessment')
+    StudentAssessment.objects.filter(recommendation_snapshot__isnull=True).update(recommendation_snapshot=[])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0009_inferencejob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentassessment',
+            name='recommendation_snapshot',
+            field=models.JSONField(blank=True, default=None, null=True),
+        ),
+        migrations.RunPython(mark_unbuilt_snapshots, unmark_unbuilt_snapshots),
+    ]
@@ -32,10 +32,40 @@ class StudentAssessment(models.Model):
     subject_scores = models.JSONField()  # Store subject preferences and scores
     personality_traits = models.JSONField(default=dict)
     career_interests = models.JSONField(default=list)
+    # Ranked recommendations as rendered on the results page, so the page
+    # needs no joins (see CareerRecommendation.to_snapshot); None until
+    # built, [] once scored with no recommendations
+    recommendation_snapshot = models.JSONField(null=True, blank=True, default=None)
+    # Last time recommendations were (re)computed; drives results page ETags
+    scored_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's dashboard
+            models.Index(fields=['user', '-created_at', '-id'], name='assessment_user_created_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.name} - {self.session_id}"
+    
+    def to_student_data(self):
+        """Input dict for the inference engine"""
+        return {
+            'subject_scores': self.subject_scores,
+            'personality_traits': self.personality_traits,
+            'career_interests': self.career_interests,
+            'age': self.age,
+            'education_level': self.education_level
+        }
+
+def confidence_percent(confidence_score):
+    """Convert a confidence score into a clean 0-100 percentage"""
+    if confidence_score is None:
+        return 0
+    if 0 <= confidence_score <= 1:  # normalized (0-1)
+        return round(confidence_score * 100)
+    return round(confidence_score)  # already in %
 
 class CareerRecommendation(models.Model):
     assessment = models.ForeignKey(StudentAssessment, on_delete=models.CASCADE, related_name='recommendations')
@@ -53,14 +83,22 @@ class CareerRecommendation(models.Model):
         career_name = self.career.name if self.career else "Unknown Career"
         return f"{career_name} - {self.confidence_score}%"
 
+    def to_snapshot(self):
+        """Compact dict stored in StudentAssessment.recommendation_snapshot"""
+        return {
+            'rank': self.rank,
+            'career_name': self.career.name if self.career else "Unknown Career",
+            'description': self.career.description if self.career else "",
+            'category': self.career.category if self.career else "General",
+            'confidence_score': self.confidence_score,
+            'confidence_percent': self.confidence_percent,
+            'reasoning': self.reasoning,
+        }
+
     @property
     def confidence_percent(self):
         """Convert confidence_score into a clean 0-100 percentage"""
-        if self.confidence_score is None:
-            return 0
-        if 0 <= self.confidence_score <= 1:  # normalized (0-1)
-            return round(self.confidence_score * 100)
-        return round(self.confidence_score)  # already in %
+        return confidence_percent(self.confidence_score)
     
     @property
     def match_level(self):
@@ -84,4 +122,56 @@ class CareerRecommendation(models.Model):
         elif score >= 60:
             return "confidence-medium"
         else:
-            return "confidence-low"
\ No newline at end of file
+            return "confidence-low"
+class RuleSet(models.Model):
+    """
+    Versioned knowledge base and rule set (CareerInferenceEngine state).
+    The highest version is live; workers poll it and hot-swap their engine.
+    """
+    version = models.PositiveIntegerField(unique=True)
+    state = models.JSONField()
+    comment = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-version']
+
+    def __str__(self):
+        return f"Rule set v{self.version}"
+
+class InferenceJob(models.Model):
+    """
+    Durable queue entry for scoring an assessment outside the request
+    (see counselor.jobs); one per assessment
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    assessment = models.OneToOneField(StudentAssessment, on_delete=models.CASCADE, related_name='inference_job')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest pending job
+            models.Index(fields=['status', 'created_at'], name='inference_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Inference job for {self.assessment_id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
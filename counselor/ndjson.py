@@ -0,0 +1,115 @@
+import codecs
+import json
+
+READ_CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def iter_ndjson(stream):
+    """Yield one decoded value per non-blank line of a binary stream"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Incrementally decode a top-level JSON array from a binary stream,
+    yielding its items without holding the whole document in memory
+    """
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unterminated JSON array" if started else "Expected a JSON array")
+            fill()
+            continue
+
+        char = buffer[pos]
+        if not started:
+            if char != '[':
+                raise ValueError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if char == ']':
+            return
+        if char == ',':
+            pos += 1
+            continue
+
+        try:
+            item, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Most likely the item is split across chunks
+            if eof:
+                raise
+            fill()
+            continue
+        if end == len(buffer) and not eof:
+            # A number at the end of the buffer may continue in the next chunk
+            fill()
+            continue
+        pos = end
+        yield item
+
+
+def iter_request_items(request):
+    """
+    Items of a request body sent either as a JSON array or as NDJSON
+    (one JSON object per line)
+    """
+    content_type = request.content_type or ''
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        return iter_ndjson(request)
+
+    # Sniff the first non-blank byte: '[' means a JSON array
+    head = request.read(1)
+    while head and head.isspace():
+        head = request.read(1)
+    if head == b'[':
+        return iter_json_array(_Prefixed(head, request))
+    return iter_ndjson(_Prefixed(head, request))
+
+
+class _Prefixed:
+    """Binary stream with some already-consumed bytes pushed back in front"""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size=-1):
+        if self.prefix:
+            data, self.prefix = self.prefix, b''
+            if size is None or size < 0:
+                return data + self.stream.read()
+            return data + self.stream.read(max(size - len(data), 0))
+        return self.stream.read(size)
+
+    def __iter__(self):
+        if self.prefix:
+            data, self.prefix = self.prefix, b''
+            yield data + self.stream.readline()
+        yield from self.stream
+
+
+def dumps_line(value):
+    """Encode one NDJSON output line"""
+    return json.dumps(value, separators=(',', ':'), default=str) + '\n'
@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import http_cache
+from .models import StudentAssessment, CareerRecommendation, Career
+
+
+def _resolve_careers(ranked_by_name):
+    """
+    Map career names to Career rows with one IN query, creating the
+    missing ones with a single bulk insert
+    """
+    careers = {career.name: career for career in Career.objects.filter(name__in=ranked_by_name)}
+    missing = [
+        Career(
+            name=name,
+            category=rec.get('category', 'General'),
+            description=rec.get('description', rec.get('reasoning', 'No description provided'))
+        )
+        for name, rec in ranked_by_name.items() if name not in careers
+    ]
+    if missing:
+        # ignore_conflicts covers careers created concurrently by another request
+        Career.objects.bulk_create(missing, ignore_conflicts=True)
+        careers.update(
+            (career.name, career)
+            for career in Career.objects.filter(name__in=[career.name for career in missing])
+        )
+    return careers
+
+
+def save_recommendation_sets(items):
+    """
+    Persist recommendations for many assessments at once.
+
+    ``items`` is a list of (assessment, recommendations). Previous
+    recommendations of those assessments are replaced, snapshots and
+    scored_at are updated, and cached results pages are evicted after
+    commit. Runs a fixed number of queries regardless of the batch size.
+    """
+    rankings = []
+    first_seen = {}
+    for assessment, recommendations in items:
+        # A career can only be recommended once per assessment
+        ranked = {}
+        for rec in recommendations:
+            ranked.setdefault(rec.get('career_name', 'Unknown Career'), rec)
+        rankings.append((assessment, ranked))
+        for name, rec in ranked.items():
+            first_seen.setdefault(name, rec)
+
+    if not rankings:
+        return 0
+
+    scored_at = timezone.now()
+    with transaction.atomic():
+        careers = _resolve_careers(first_seen)
+
+        CareerRecommendation.objects.filter(
+            assessment__in=[assessment.pk for assessment, _ in rankings]
+        ).delete()
+
+        career_recommendations = []
+        for assessment, ranked in rankings:
+            assessment_recommendations = [
+                CareerRecommendation(
+                    assessment=assessment,
+                    career=careers[name],
+                    confidence_score=rec.get('confidence_score', 0),
+                    reasoning=rec.get('reasoning', 'No reasoning provided'),
+                    rank=i + 1
+                )
+                for i, (name, rec) in enumerate(ranked.items())
+            ]
+            career_recommendations.extend(assessment_recommendations)
+
+            # Denormalised copy for the results page
+            assessment.recommendation_snapshot = [rec.to_snapshot() for rec in assessment_recommendations]
+            assessment.scored_at = scored_at
+
+        CareerRecommendation.objects.bulk_create(career_recommendations)
+        StudentAssessment.objects.bulk_update(
+            [assessment for assessment, _ in rankings],
+            ['recommendation_snapshot', 'scored_at']
+        )
+
+        # Cached results pages are stale once the new scores are committed
+        session_ids = [assessment.session_id for assessment, _ in rankings]
+        transaction.on_commit(lambda: [http_cache.invalidate(session_id) for session_id in session_ids])
+
+    return len(career_recommendations)
@@ -0,0 +1,110 @@
+"""
+Database-backed rule sets with hot reloading.
+
+A RuleSet row holds a complete engine state (careers, subjects,
+personality rules and FOPL rules); the highest version is live. Each
+worker process checks the version counter at most once per
+COUNSELOR_RULESET_CHECK_INTERVAL seconds, compiles a new version once and
+swaps it in with set_engine(). Requests already running keep the engine
+they started with.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Max
+
+from .ai_engine.career_engine import CareerInferenceEngine, get_engine, set_engine
+from .models import RuleSet
+
+_reload_lock = threading.Lock()
+_last_check = None
+_seen_version = None  # Last version compiled (or that failed to compile)
+
+
+def _interval():
+    return getattr(settings, 'COUNSELOR_RULESET_CHECK_INTERVAL', 5)
+
+
+def _stored_state(state):
+    """
+    Database form of an engine state: careers as a list of [key, info]
+    pairs, since jsonb does not keep object key order and knowledge base
+    order breaks ranking ties
+    """
+    return dict(state, careers=[[key, info] for key, info in state['careers'].items()])
+
+
+def _loaded_state(stored):
+    """Inverse of _stored_state(); rows stored as an object load as they are"""
+    careers = stored.get('careers')
+    if isinstance(careers, list):
+        return dict(stored, careers={key: info for key, info in careers})
+    return stored
+
+
+def latest_version():
+    """Live rule set version, or None when no rule set was published"""
+    return RuleSet.objects.aggregate(version=Max('version'))['version']
+
+
+def publish(state, comment=''):
+    """
+    Compile ``state`` (which also validates it) and store it as the next
+    version. Returns the new RuleSet and its engine.
+    """
+    engine = CareerInferenceEngine.from_state(state)
+    with transaction.atomic():
+        # version is unique: a concurrent publish fails instead of sharing a number
+        ruleset = RuleSet.objects.create(
+            version=(latest_version() or 0) + 1,
+            state=_stored_state(engine.export_state()),
+            comment=comment
+        )
+    engine.ruleset_version = ruleset.version
+    return ruleset, engine
+
+
+def refresh_due():
+    """True when refresh() would check the database again (no I/O)"""
+    return _last_check is None or time.monotonic() - _last_check >= _interval()
+
+
+def refresh(force=False):
+    """
+    Swap in the live rule set if its version changed since the last check.
+    Throttled to one query per interval; a thread that finds another one
+    already reloading carries on with the current engine.
+    """
+    global _last_check, _seen_version
+
+    now = time.monotonic()
+    if not force and _last_check is not None and now - _last_check < _interval():
+        return get_engine()
+    if not _reload_lock.acquire(blocking=force):
+        return get_engine()
+
+    try:
+        _last_check = now
+        try:
+            version = latest_version()
+            if version is None or version == _seen_version:
+                return get_engine()
+            state = _loaded_state(RuleSet.objects.values_list('state', flat=True).get(version=version))
+        except DatabaseError as e:
+            print(f"Rule set check failed: {e}")
+            return get_engine()
+
+        _seen_version = version
+        try:
+            engine = CareerInferenceEngine.from_state(state)
+        except Exception as e:
+            # Keep serving the current engine; the next publish retries
+            print(f"Rule set v{version} failed to compile: {e}")
+            return get_engine()
+        engine.ruleset_version = version
+        set_engine(engine)
+        return engine
+    finally:
+        _reload_lock.release()
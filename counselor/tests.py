@@ -1,3 +1,989 @@
-from django.test import TestCase
+import asyncio
+import base64
+import importlib
+import contextlib
+import io
+import json
+import os
+import random
+import threading
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.shortcuts import render
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+
+from . import http_cache, jobs, rulesets, urls, views
+from .ai_engine import timing
+from .ai_engine.career_engine import CareerInferenceEngine, get_engine, inference_cache, set_engine
+from .ai_engine.fallback_engine import GENERAL_CAREERS, INTEREST_CAREERS, SALARY_RANGES, FallbackEngine, fallback_engine
+from .ai_engine.inference_engine import MIN_RECOMMENDATION_SCORE, TOP_K
+from .ai_engine.kb_diff import EngineDiff, affected_students
+from .ai_engine.result_cache import InferenceCache
+from .ai_engine.rule_dsl import RuleSyntaxError, format_rules, parse_rule, parse_rules
+from .ai_engine.uncertainty_engine import UNCERTAINTY_LEVELS, UncertaintyEngine
+from .ai_engine.working_memory import FactLayout
+from .async_utils import InferenceBusy, InferenceExecutor
+from .management.commands import rescore_assessments
+from .models import Career, InferenceJob, RuleSet, StudentAssessment
+from .recommendation_store import save_recommendation_sets
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'test_data', 'baseline_recommendations.json')
+
+# Plain static storage and a private cache, so view tests need neither
+# collectstatic nor the shared file cache
+VIEW_SETTINGS = dict(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'counselor-tests'}},
+    COUNSELOR_JOB_WORKERS=0,
+)
+
+
+CHAINED_RULES = [
+    "R1 [0.9]: high_score(mathematics) ∧ high_score(physics) ⇒ suitable_career(engineer)",
+    "R2 [0.7]: suitable_career(engineer) ∧ personality_trait(logical) ⇒ suitable_career(data_scientist)",
+    "R3 [0.6]: suitable_career(data_scientist) ∧ good_score(economics) ⇒ suitable_career(teacher)",
+    "R4 [0.8]: high_score(art) ∧ high_score(art) ∧ unknown(x) ⇒ suitable_career(graphic_designer)",
+    "R5 [0.5]: ¬high_score(biology) ∧ good_score(english) ∧ good_score(history) ⇒ suitable_career(lawyer)",
+]
+
+
+def _student(subject_scores, interests=(), traits=None, age=18, education_level='undergrad'):
+    return {
+        'subject_scores': subject_scores,
+        'career_interests': list(interests),
+        'personality_traits': traits or {},
+        'age': age,
+        'education_level': education_level,
+    }
+
+
+def _random_students(engine, count, seed, decimals=(0, 1, 2, 3)):
+    """Seeded profiles over the knowledge base subjects, with fractional scores"""
+    rnd = random.Random(seed)
+    subjects = list(engine.kb.subjects_data)
+    students = []
+    for _ in range(count):
+        picked = rnd.sample(subjects, rnd.randint(1, len(subjects)))
+        students.append(_student({s: round(rnd.uniform(30, 100), rnd.choice(decimals)) for s in picked}))
+    return students
+
+
+def _load_baseline():
+    with open(BASELINE_PATH, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def _quietly():
+    # The views log to stdout and print tracebacks to stderr
+    stack = contextlib.ExitStack()
+    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+    stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+    return stack
+
+
+def _engine_with_rules(rules):
+    state = CareerInferenceEngine().export_state()
+    state['rules'] = rules
+    return CareerInferenceEngine.from_state(state)
+
+
+def _create_assessment(user=None, subject_scores=None, **fields):
+    return StudentAssessment.objects.create(
+        user=user,
+        session_id=str(uuid.uuid4()),
+        name=fields.pop('name', 'Test Student'),
+        age=fields.pop('age', 18),
+        education_level=fields.pop('education_level', 'undergrad'),
+        subject_scores=subject_scores if subject_scores is not None else {
+            'mathematics': 92, 'physics': 88, 'chemistry': 75, 'computer_science': 90,
+        },
+        **fields
+    )
+
+
+class EngineBaselineTests(SimpleTestCase):
+    """Recommendations recorded from the original scalar engine"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.engine = CareerInferenceEngine()
+        cls.cases = _load_baseline()['engine']
+
+    def test_infer_careers_matches_baseline(self):
+        for case in self.cases:
+            raw = self.engine.infer_careers(_student(case['subject_scores']))
+            self.assertEqual([[r['career_name'], r['confidence_score']] for r in raw], case['raw'], case)
+
+    def test_recommend_matches_baseline(self):
+        for case in self.cases:
+            for use_cache in (False, True):
+                recommendations = self.engine.recommend(_student(case['subject_scores']), use_cache=use_cache)
+                self.assertEqual(
+                    [[r['career_name'], r['confidence_score'], r['uncertainty_level'], r['rank']] for r in recommendations],
+                    case['recommendations'], case
+                )
+
+    def test_batch_matches_baseline(self):
+        students = [_student(case['subject_scores']) for case in self.cases]
+        for case, raw in zip(self.cases, self.engine.infer_careers_batch(students)):
+            self.assertEqual([[r['career_name'], r['confidence_score']] for r in raw], case['raw'], case)
+        for case, recommendations in zip(self.cases, self.engine.recommend_batch(students)):
+            self.assertEqual(
+                [[r['career_name'], r['confidence_score'], r['uncertainty_level'], r['rank']] for r in recommendations],
+                case['recommendations'], case
+            )
+
+
+class AdvancedInferenceTests(SimpleTestCase):
+    """run_advanced_ai_inference degrades like the per-request pipeline did"""
+
+    def setUp(self):
+        inference_cache.clear()
+        self.assessment = StudentAssessment(
+            name='Test Student', age=18, education_level='undergrad',
+            subject_scores={'mathematics': 92, 'physics': 88, 'computer_science': 90},
+            personality_traits={}, career_interests=['technology'],
+        )
+
+    def run_inference(self):
+        with _quietly():
+            return views.run_advanced_ai_inference(self.assessment)
+
+    def test_uses_shared_engine(self):
+        self.assertEqual(self.run_inference(), get_engine().recommend(self.assessment.to_student_data()))
+
+    def test_uncertainty_error_returns_raw_recommendations(self):
+        engine = get_engine()
+        with mock.patch.object(engine.uncertainty_engine, 'apply_uncertainty_to_recommendations', side_effect=ValueError):
+            recommendations = self.run_inference()
+        self.assertEqual(recommendations, engine.infer_careers(self.assessment.to_student_data()))
+
+    def test_inference_error_uses_fallback(self):
+        with mock.patch.object(get_engine().inference_engine, 'infer_careers', side_effect=ValueError):
+            recommendations = self.run_inference()
+        self.assertEqual(recommendations, fallback_engine.recommend(self.assessment.to_student_data()))
+
+
+class BatchScoringParityTests(SimpleTestCase):
+    """The NumPy batch path must return exactly what the scalar path does"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.engine = CareerInferenceEngine()
+
+    def assertBatchMatchesScalar(self, students, engine=None):
+        engine = engine or self.engine
+        batch = engine.recommend_batch(students)
+        for student_data, recommendations in zip(students, batch):
+            self.assertEqual(recommendations, engine.recommend(student_data, use_cache=False), student_data)
+
+    def test_half_way_confidences_round_like_scalar(self):
+        # Base confidences on a .xx5 boundary, where np.round and round() differ
+        self.assertBatchMatchesScalar([
+            _student({
+                'physical_education': 94.3, 'physics': 45.108, 'business_studies': 64.0, 'geography': 67.8,
+                'chemistry': 91.58, 'history': 32.0, 'art': 39.2, 'music': 68.25, 'biology': 30.92,
+                'computer_science': 39.6, 'mathematics': 80.07, 'english': 85.0, 'economics': 82.6,
+            }),
+            _student({
+                'biology': 35.75, 'music': 80.008, 'computer_science': 90.97, 'mathematics': 85.5,
+                'physical_education': 37.57, 'art': 34.452, 'business_studies': 90.5,
+            }),
+        ])
+
+    def test_fractional_scores_match_scalar(self):
+        self.assertBatchMatchesScalar(_random_students(self.engine, 2000, seed=21))
+
+    def test_chained_rules_match_scalar(self):
+        engine = _engine_with_rules(CHAINED_RULES)
+        self.assertBatchMatchesScalar(_random_students(engine, 500, seed=8), engine)
+
+    def test_limit_truncates_scalar_result(self):
+        students = _random_students(self.engine, 200, seed=5, decimals=(0,))
+        for student_data, recommendations in zip(students, self.engine.recommend_batch(students, limit=5)):
+            self.assertEqual(recommendations, self.engine.recommend(student_data, use_cache=False)[:5])
+
+
+class InferenceCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0
+        self.cache = InferenceCache(maxsize=2, ttl=10, clock=lambda: self.now)
+        self.calls = 0
+        self.required = ['mathematics', 'physics']
+
+    def compute(self, student_data):
+        self.calls += 1
+        return [{'career_name': 'Engineer', 'confidence_score': 80, 'required_subjects': self.required}]
+
+    def test_hit_returns_copies(self):
+        first = self.cache.get_or_compute(_student({'mathematics': 90}), 'v1', self.compute)
+        first[0]['confidence_score'] = 0
+        first[0]['required_subjects'].append('art')
+        second = self.cache.get_or_compute(_student({'mathematics': 90.0}), 'v1', self.compute)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second[0]['confidence_score'], 80)
+        second[0]['required_subjects'].append('music')
+        third = self.cache.get_or_compute(_student({'mathematics': 90}), 'v1', self.compute)
+        self.assertEqual(third[0]['required_subjects'], ['mathematics', 'physics'])
+        self.assertEqual(self.required, ['mathematics', 'physics'])
+
+    def test_engine_lists_are_not_shared(self):
+        engine = CareerInferenceEngine()
+        student_data = _student({'mathematics': 92, 'physics': 88, 'computer_science': 90})
+        inference_cache.clear()
+        for _ in range(2):
+            for rec in engine.recommend(student_data):
+                rec['required_subjects'].append('art')
+                rec['preferred_subjects'].clear()
+        self.assertEqual(engine.recommend(student_data), engine.recommend(student_data, use_cache=False))
+
+    def test_version_change_drops_entries(self):
+        self.cache.get_or_compute(_student({'mathematics': 90}), 'v1', self.compute)
+        self.cache.get_or_compute(_student({'mathematics': 90}), 'v2', self.compute)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+    def test_ttl_and_lru_eviction(self):
+        for score in (60, 70, 80):
+            self.cache.get_or_compute(_student({'mathematics': score}), 'v1', self.compute)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.now = 11
+        self.cache.get_or_compute(_student({'mathematics': 80}), 'v1', self.compute)
+        self.assertEqual(self.calls, 4)
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+
+@override_settings(**VIEW_SETTINGS)
+class RecommendationStoreTests(TestCase):
+    recommendations = [
+        {'career_name': 'Software Engineer', 'confidence_score': 88, 'reasoning': 'Strong maths'},
+        {'career_name': 'Data Scientist', 'confidence_score': 80, 'category': 'Technology'},
+        {'career_name': 'Software Engineer', 'confidence_score': 70},
+    ]
+
+    def save(self, assessments):
+        with self.captureOnCommitCallbacks(execute=True):
+            return save_recommendation_sets([(assessment, self.recommendations) for assessment in assessments])
+
+    def test_replaces_previous_recommendations(self):
+        assessment = _create_assessment()
+        self.save([assessment])
+        self.assertEqual(self.save([assessment]), 2)
+        self.assertEqual(
+            list(assessment.recommendations.order_by('rank').values_list('career__name', 'rank')),
+            [('Software Engineer', 1), ('Data Scientist', 2)]
+        )
+        assessment.refresh_from_db()
+        self.assertEqual([rec['career_name'] for rec in assessment.recommendation_snapshot],
+                         ['Software Engineer', 'Data Scientist'])
+        self.assertIsNotNone(assessment.scored_at)
+        self.assertEqual(Career.objects.count(), 2)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        self.save([_create_assessment()])
+        one = [_create_assessment()]
+        many = [_create_assessment() for _ in range(5)]
+        with CaptureQueriesContext(connection) as single:
+            self.save(one)
+        with CaptureQueriesContext(connection) as batch:
+            self.save(many)
+        self.assertEqual(len(batch), len(single))
+
+
+@override_settings(**VIEW_SETTINGS)
+class AssessmentFormTests(TestCase):
+    post_data = {
+        'name': 'Form Student', 'age': '18', 'education_level': 'undergrad', 'interests': ['engineering'],
+        'score_mathematics': '90', 'score_physics': '85', 'score_chemistry': '70',
+    }
+
+    def test_synchronous_scoring(self):
+        with _quietly():
+            response = Client().post(reverse('assessment_form'), self.post_data)
+        assessment = StudentAssessment.objects.get()
+        self.assertRedirects(response, reverse('results', args=[assessment.session_id]), fetch_redirect_response=False)
+        self.assertEqual(
+            [rec['career_name'] for rec in assessment.recommendation_snapshot],
+            list(assessment.recommendations.order_by('rank').values_list('career__name', flat=True))
+        )
+        self.assertTrue(assessment.recommendation_snapshot)
+
+    @override_settings(COUNSELOR_ASYNC_ASSESSMENTS=True)
+    def test_asynchronous_scoring_enqueues(self):
+        with _quietly():
+            Client().post(reverse('assessment_form'), self.post_data)
+        assessment = StudentAssessment.objects.get()
+        self.assertIsNone(assessment.recommendation_snapshot)
+        self.assertEqual(assessment.inference_job.status, InferenceJob.PENDING)
+
+    @override_settings(COUNSELOR_SERVER_TIMING=True)
+    def test_server_timing_phases(self):
+        with _quietly():
+            response = Client().post(reverse('assessment_form'), self.post_data)
+        phases = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        for phase in ('form', 'insert', 'save', 'total'):
+            self.assertIn(phase, phases)
+        self.assertGreater(timing.snapshot()['total']['count'], 0)
+
+    @override_settings(COUNSELOR_SERVER_TIMING=False)
+    def test_server_timing_header_off(self):
+        response = Client().get(reverse('assessment_form'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_timings_staff_only(self):
+        client = Client()
+        self.assertEqual(client.get(reverse('api_timings')).status_code, 302)
+        client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertIn('phases', client.get(reverse('api_timings')).json())
+
+
+@override_settings(**VIEW_SETTINGS)
+class ResultsSnapshotTests(TestCase):
+    def get(self, assessment):
+        with _quietly(), CaptureQueriesContext(connection) as queries:
+            response = Client().get(reverse('results', args=[assessment.session_id]))
+        return response, ' '.join(query['sql'] for query in queries)
+
+    def test_renders_from_snapshot(self):
+        assessment = _create_assessment()
+        with self.captureOnCommitCallbacks(execute=True):
+            save_recommendation_sets([(assessment, get_engine().recommend(assessment.to_student_data()))])
+        response, sql = self.get(assessment)
+        self.assertContains(response, assessment.recommendations.get(rank=1).career.name)
+        self.assertNotIn('counselor_careerrecommendation', sql)
+        self.assertNotIn('counselor_inferencejob', sql)
+
+    def test_scored_without_recommendations(self):
+        assessment = _create_assessment()
+        with self.captureOnCommitCallbacks(execute=True):
+            save_recommendation_sets([(assessment, [])])
+        assessment.refresh_from_db()
+        self.assertEqual(assessment.recommendation_snapshot, [])
+        response, sql = self.get(assessment)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('counselor_careerrecommendation', sql)
+        self.assertNotIn('counselor_inferencejob', sql)
+
+    def test_builds_missing_snapshot_once(self):
+        assessment = _create_assessment()
+        save_recommendation_sets([(assessment, get_engine().recommend(assessment.to_student_data()))])
+        StudentAssessment.objects.filter(pk=assessment.pk).update(recommendation_snapshot=None)
+        response, sql = self.get(assessment)
+        self.assertIn('counselor_careerrecommendation', sql)
+        assessment.refresh_from_db()
+        self.assertEqual(
+            [rec['career_name'] for rec in assessment.recommendation_snapshot],
+            list(assessment.recommendations.order_by('rank').values_list('career__name', flat=True))
+        )
+        self.assertContains(response, assessment.recommendation_snapshot[0]['career_name'])
+
+    def test_new_assessments_have_no_snapshot(self):
+        self.assertIsNone(_create_assessment().recommendation_snapshot)
+
+
+@override_settings(**VIEW_SETTINGS)
+class ResultsViewTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def score(self, assessment):
+        with self.captureOnCommitCallbacks(execute=True):
+            save_recommendation_sets([(assessment, get_engine().recommend(assessment.to_student_data()))])
+        assessment.refresh_from_db()
+
+    def get(self, assessment, **headers):
+        with _quietly():
+            return self.client.get(reverse('results', args=[assessment.session_id]), **headers)
+
+    def test_conditional_get(self):
+        assessment = _create_assessment()
+        self.score(assessment)
+        response = self.get(assessment)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, assessment.recommendation_snapshot[0]['career_name'])
+        etag = response['ETag']
+
+        cached = self.get(assessment)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(self.get(assessment, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.get(assessment, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        # Re-scoring changes the validators and evicts the cached page
+        StudentAssessment.objects.filter(pk=assessment.pk).update(scored_at=timezone.now() - timedelta(days=1))
+        self.score(assessment)
+        rescored = self.get(assessment, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(rescored.status_code, 200)
+        self.assertNotEqual(rescored['ETag'], etag)
+
+    def test_etag_varies_by_viewer(self):
+        assessment = _create_assessment()
+        self.score(assessment)
+        anonymous = self.get(assessment)['ETag']
+        self.client.force_login(User.objects.create_user('viewer'))
+        self.assertNotEqual(self.get(assessment)['ETag'], anonymous)
+
+    def test_rescore_during_render_is_not_cached(self):
+        assessment = _create_assessment()
+        self.score(assessment)
+        rescored_at = assessment.scored_at + timedelta(minutes=1)
+
+        def render_then_rescore(*args, **kwargs):
+            # The re-score commits, and invalidates, before the page is stored
+            response = render(*args, **kwargs)
+            StudentAssessment.objects.filter(pk=assessment.pk).update(scored_at=rescored_at)
+            http_cache.invalidate(assessment.session_id)
+            return response
+
+        with mock.patch('counselor.views.render', side_effect=render_then_rescore):
+            stale = self.get(assessment)
+        self.assertIsNone(http_cache.get_validators(assessment.session_id))
+        fresh = self.get(assessment, HTTP_IF_NONE_MATCH=stale['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], stale['ETag'])
+        self.assertEqual(http_cache.get_validators(assessment.session_id)[0], rescored_at.isoformat())
+
+    def test_pending_and_failed_jobs(self):
+        assessment = _create_assessment()
+        job = jobs.enqueue(assessment)
+        response = self.get(assessment)
+        self.assertContains(response, 'Analyzing Your Profile')
+        self.assertIn('no-store', response['Cache-Control'])
+        status = self.client.get(reverse('results_status', args=[assessment.session_id])).json()
+        self.assertEqual((status['status'], status['finished']), (InferenceJob.PENDING, False))
+
+        InferenceJob.objects.filter(pk=job.pk).update(status=InferenceJob.FAILED)
+        self.assertContains(self.get(assessment), 'We Could Not Analyze Your Profile')
+        status = self.client.get(reverse('results_status', args=[assessment.session_id])).json()
+        self.assertEqual((status['status'], status['finished']), (InferenceJob.FAILED, True))
+
+    def test_status_of_unknown_assessment(self):
+        response = self.client.get(reverse('results_status', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_status_of_synchronously_scored_assessment(self):
+        assessment = _create_assessment()
+        status = self.client.get(reverse('results_status', args=[assessment.session_id])).json()
+        self.assertEqual((status['status'], status['finished']), (InferenceJob.DONE, True))
+
+
+@override_settings(**VIEW_SETTINGS)
+class DashboardPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student')
+        other = User.objects.create_user('other')
+        _create_assessment(user=other)
+        now = timezone.now()
+        for i in range(30):
+            assessment = _create_assessment(user=self.user, name=f'A{i}')
+            # Pairs share a timestamp, so the id tie-break is exercised
+            StudentAssessment.objects.filter(pk=assessment.pk).update(created_at=now - timedelta(minutes=i // 2))
+        self.client.force_login(self.user)
+
+    def page(self, cursor=None):
+        params = {'cursor': cursor} if cursor else {}
+        return self.client.get(reverse('api_dashboard'), params).json()
+
+    def test_pages_cover_every_assessment_once(self):
+        first = self.page()
+        self.assertEqual(len(first['assessments']), 25)
+        second = self.page(first['next_cursor'])
+        self.assertEqual(len(second['assessments']), 5)
+        self.assertIsNone(second['next_cursor'])
+
+        names = [a['name'] for a in first['assessments'] + second['assessments']]
+        expected = list(
+            StudentAssessment.objects.filter(user=self.user)
+            .order_by('-created_at', '-id').values_list('name', flat=True)
+        )
+        self.assertEqual(names, expected)
+
+    def test_top_career_annotation(self):
+        assessment = StudentAssessment.objects.get(user=self.user, name='A0')
+        save_recommendation_sets([(assessment, get_engine().recommend(assessment.to_student_data()))])
+        top = {a['name']: a['top_career'] for a in self.page()['assessments']}
+        self.assertEqual(top['A0'], assessment.recommendations.get(rank=1).career.name)
+        self.assertIsNone(top['A1'])
+
+    def test_invalid_cursor_starts_over(self):
+        cursor = base64.urlsafe_b64encode(b'not-a-cursor').decode()
+        self.assertEqual(self.page(cursor)['assessments'], self.page()['assessments'])
+
+    def test_dashboard_page(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'A0')
+        self.assertNotContains(response, 'A29')
+
+    def test_login_required(self):
+        self.client.logout()
+        for name in ('dashboard', 'api_dashboard'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 302)
+            self.assertIn('next=', response['Location'])
+
+
+@override_settings(**VIEW_SETTINGS)
+class BatchApiTests(TestCase):
+    students = [
+        {'subject_scores': {'mathematics': 92, 'physics': 88, 'chemistry': 75}},
+        {'subject_scores': {'biology': 91, 'chemistry': 86, 'english': 70.5}},
+        {'subject_scores': {'mathematics': 'high'}},
+        {'subject_scores': {}},
+    ]
+
+    def post(self, body, content_type):
+        with _quietly():
+            response = Client().post(reverse('api_career_suggestions_batch'), body, content_type=content_type)
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        return [json.loads(line) for line in lines]
+
+    def expected(self, student):
+        with _quietly():
+            return Client().post(
+                reverse('api_career_suggestions'), json.dumps(student), content_type='application/json'
+            ).json()['recommendations']
+
+    def assertResults(self, results):
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3])
+        for student, result in zip(self.students, results):
+            if result['success']:
+                self.assertEqual(result['recommendations'], self.expected(student))
+        self.assertFalse(results[2]['success'])
+        self.assertIn('mathematics', results[2]['error'])
+
+    def test_json_array(self):
+        self.assertResults(self.post(json.dumps(self.students), 'application/json'))
+
+    def test_ndjson(self):
+        body = ''.join(json.dumps(student) + '\n' for student in self.students)
+        self.assertResults(self.post(body, 'application/x-ndjson'))
+
+    def test_malformed_body_reports_position(self):
+        body = json.dumps(self.students[0]) + '\n{"subject_scores": \n'
+        results = self.post(body, 'application/x-ndjson')
+        self.assertTrue(results[0]['success'])
+        self.assertEqual(results[1]['index'], 1)
+        self.assertIn('Invalid request body', results[1]['error'])
+
+
+class KbDiffTests(SimpleTestCase):
+    def setUp(self):
+        self.new_engine = CareerInferenceEngine()
+        self.new_state = self.new_engine.export_state()
+
+    def assertFlagsEveryChange(self, old_state, students):
+        old_engine = CareerInferenceEngine.from_state(old_state)
+        diff = EngineDiff(old_state, self.new_state)
+        old_results = [old_engine.recommend(s, use_cache=False) for s in students]
+        flags = affected_students(
+            diff, old_engine, self.new_engine, students,
+            [{r['career_name'] for r in results} for results in old_results]
+        )
+        changed = [
+            old != self.new_engine.recommend(s, use_cache=False)
+            for s, old in zip(students, old_results)
+        ]
+        self.assertTrue(any(changed))
+        for student_data, flag, did_change in zip(students, flags, changed):
+            if did_change:
+                self.assertTrue(flag, student_data)
+        self.assertLess(sum(flags), len(students))
+        return diff
+
+    def test_threshold_change(self):
+        old_state = CareerInferenceEngine().export_state()
+        career = list(old_state['careers'])[3]
+        old_state['careers'][career]['min_threshold'] = old_state['careers'][career].get('min_threshold', 60) + 5
+        diff = self.assertFlagsEveryChange(old_state, _random_students(self.new_engine, 1500, seed=13, decimals=(0,)))
+        self.assertEqual(diff.affected_careers, [career])
+        self.assertTrue(set(old_state['careers'][career]['required_subjects']) <= set(diff.relevant_subjects))
+
+    def test_rule_change(self):
+        old_state = CareerInferenceEngine().export_state()
+        old_state['rules'] = old_state['rules'][:-1]
+        self.assertFlagsEveryChange(old_state, _random_students(self.new_engine, 1500, seed=14, decimals=(0,)))
+
+    def test_variable_rules_are_unbounded(self):
+        state = CareerInferenceEngine().export_state()
+        state['rules'] = state['rules'] + [
+            "V [0.6]: high_score(?S) ∧ requires(?C, ?S) ⇒ suitable_career(?C)"
+        ]
+        diff = EngineDiff(state, self.new_state)
+        self.assertIsNone(diff.relevant_subjects)
+
+
+class RescoreCandidateTests(TestCase):
+    def test_candidates_cover_relevant_subjects_and_stale_listings(self):
+        old_state = CareerInferenceEngine().export_state()
+        career = list(old_state['careers'])[3]
+        old_state['careers'][career]['min_threshold'] = old_state['careers'][career].get('min_threshold', 60) + 5
+        diff = EngineDiff(old_state, CareerInferenceEngine().export_state())
+        unrelated = [s for s in old_state['subjects'] if s not in diff.relevant_subjects]
+
+        scored = _create_assessment(subject_scores={diff.relevant_subjects[0]: 80})
+        listing = _create_assessment(subject_scores={unrelated[0]: 80})
+        save_recommendation_sets([(listing, [{'career_name': next(iter(diff.stale_names))}])])
+        _create_assessment(subject_scores={unrelated[0]: 80})
+
+        candidates = StudentAssessment.objects.filter(rescore_assessments.Command()._candidates(diff))
+        self.assertEqual(set(candidates), {scored, listing})
+
+
+class RankingTests(SimpleTestCase):
+    """Branch-and-bound top k against a full sort of every match"""
+
+    def exhaustive(self, engine, rule_scores, student_data):
+        merged = dict(rule_scores)
+        for career_key, score in engine._apply_direct_matching(student_data).items():
+            merged[career_key] = max(merged.get(career_key, 0), score)
+        ranked = sorted(merged.items(), key=lambda item: item[1], reverse=True)[:TOP_K]
+        return [item for item in ranked if item[1] > MIN_RECOMMENDATION_SCORE]
+
+    def assertRanksLikeFullSort(self, engine, students, seed):
+        rnd = random.Random(seed)
+        careers = [career_key for career_key, _ in engine.careers]
+        for student_data in students:
+            # Coarse rule scores produce plenty of ties
+            rule_scores = {c: rnd.choice([0.3, 0.5, 0.6, 0.75, 0.9]) for c in rnd.sample(careers, rnd.randint(0, 4))}
+            ranked = engine._rank_careers(dict(rule_scores), student_data['subject_scores'])
+            self.assertEqual(
+                [item for item in ranked if item[1] > MIN_RECOMMENDATION_SCORE],
+                self.exhaustive(engine, rule_scores, student_data), student_data
+            )
+
+    def test_rank_careers_equals_full_sort(self):
+        engine = get_engine()
+        self.assertRanksLikeFullSort(
+            engine.inference_engine, _random_students(engine, 1500, seed=16, decimals=(0, 1)), seed=16
+        )
+
+    def test_repeated_preferred_subjects(self):
+        # Each listing of a preferred subject adds its bonus, so the bound
+        # must allow a subject more than once
+        rnd = random.Random(161)
+        state = CareerInferenceEngine().export_state()
+        subjects = list(state['subjects'])
+        state['careers'] = {
+            f'c{i}': {
+                'name': f'C{i}',
+                'required_subjects': rnd.sample(subjects, rnd.randint(1, 3)),
+                'preferred_subjects': [rnd.choice(subjects[:4]) for _ in range(rnd.randint(0, 4))],
+                'min_threshold': rnd.choice([50, 60, 70, 80]),
+            }
+            for i in range(300)
+        }
+        state['rules'] = []
+        engine = CareerInferenceEngine.from_state(state)
+        self.assertRanksLikeFullSort(
+            engine.inference_engine, _random_students(engine, 1500, seed=162, decimals=(0,)), seed=163
+        )
+
+
+class RuleDslTests(SimpleTestCase):
+    def test_default_rules_round_trip(self):
+        text = format_rules(CareerInferenceEngine().fopl_engine.rules)
+        self.assertEqual(format_rules(parse_rules(text)), text)
+
+    def test_syntax_errors_carry_line_numbers(self):
+        with self.assertRaises(RuleSyntaxError) as raised:
+            parse_rules("# comment\nR1: high_score(art) => suitable_career(artist)\nR2 high_score(art)\n")
+        self.assertEqual(raised.exception.line, 3)
+
+    def test_invalid_rules_are_rejected(self):
+        for text in (
+            "R [1.5]: high_score(art) ⇒ suitable_career(artist)",
+            "R: high_score(art) ⇒ ¬suitable_career(artist)",
+            "R: high_score(art) ⇒ a ⇒ b",
+        ):
+            with self.assertRaises(RuleSyntaxError):
+                parse_rule(text)
+
+
+class RuleSetReloadTests(TestCase):
+    def setUp(self):
+        self.engine = get_engine()
+        rulesets._last_check = None
+        rulesets._seen_version = None
+
+    def tearDown(self):
+        set_engine(self.engine)
+        rulesets._last_check = None
+        rulesets._seen_version = None
+
+    def test_published_rule_set_is_swapped_in(self):
+        state = self.engine.export_state()
+        state['rules'] = CHAINED_RULES
+        ruleset, _ = rulesets.publish(state, comment='chained')
+        engine = rulesets.refresh(force=True)
+        self.assertEqual(engine.ruleset_version, ruleset.version)
+        self.assertIs(get_engine(), engine)
+        self.assertEqual(len(engine.fopl_engine.rules), len(CHAINED_RULES))
+
+    def test_career_order_survives_storage(self):
+        state = self.engine.export_state()
+        state['careers'] = dict(reversed(list(state['careers'].items())))
+        ruleset, _ = rulesets.publish(state)
+        # Stored as pairs, so a database that reorders object keys keeps it
+        stored = RuleSet.objects.values_list('state', flat=True).get(pk=ruleset.pk)
+        self.assertEqual([key for key, _ in stored['careers']], list(state['careers']))
+        engine = rulesets.refresh(force=True)
+        self.assertEqual(list(engine.kb.careers_data), list(state['careers']))
+
+    def test_career_order_changes_engine_version(self):
+        state = self.engine.export_state()
+        reordered = dict(state, careers=dict(reversed(list(state['careers'].items()))))
+        self.assertNotEqual(
+            CareerInferenceEngine.from_state(reordered).version, CareerInferenceEngine.from_state(state).version
+        )
+
+    def test_refresh_is_throttled(self):
+        rulesets.refresh(force=True)
+        self.assertFalse(rulesets.refresh_due())
+        with self.assertNumQueries(0):
+            rulesets.refresh()
+
+    def test_invalid_state_is_not_published(self):
+        state = self.engine.export_state()
+        state['rules'] = ["R: high_score(art) ⇒"]
+        with self.assertRaises(RuleSyntaxError):
+            rulesets.publish(state)
+        self.assertFalse(RuleSet.objects.exists())
+
+
+class WorkingMemoryTests(SimpleTestCase):
+    def test_repeated_conditions_count_twice(self):
+        [rule] = parse_rules("R [0.8]: high_score(art) ∧ high_score(art) ∧ good_score(music) ⇒ suitable_career(x)")
+        layout = FactLayout([rule], [], ['x'])
+        masks = layout.compile_conditions(rule.conditions)
+        facts = layout.encode_scores({'art': 80, 'music': 50})
+        self.assertEqual(sum((facts & mask).bit_count() for mask in masks), 2)
+
+    def test_chained_rules_fire_in_later_passes(self):
+        engine = _engine_with_rules(CHAINED_RULES).inference_engine
+        career_scores, iterations = self.forward_chain(engine, _student({
+            'mathematics': 90, 'physics': 90, 'chemistry': 70, 'economics': 70, 'computer_science': 80,
+        }))
+        self.assertEqual(career_scores['engineer'], 0.9)
+        self.assertAlmostEqual(career_scores['data_scientist'], 0.7)
+        self.assertAlmostEqual(career_scores['teacher'], 0.6)
+        self.assertEqual(iterations, 3)
+
+    def test_incremental_passes_equal_full_passes(self):
+        engine = _engine_with_rules(CHAINED_RULES).inference_engine
+        for student_data in _random_students(engine, 500, seed=19, decimals=(0,)):
+            self.assertEqual(self.forward_chain(engine, student_data), self.full_passes(engine, student_data))
+
+    def forward_chain(self, engine, student_data):
+        """Rule scores and pass count of infer(), before direct matching"""
+        captured = []
+        with mock.patch.object(engine, '_generate_recommendations', lambda scores, data: captured.append(dict(scores))):
+            context = engine.infer(student_data)
+        return captured[0], context.iterations
+
+    def full_passes(self, engine, student_data):
+        """Forward chaining re-checking every rule on every pass"""
+        scores = student_data['subject_scores']
+        facts = engine.layout.encode_scores(scores) | engine._encode_traits(scores)
+        career_scores = {}
+        iterations = 0
+        pending = bool(facts & engine.watched)
+        while pending and iterations < 10:
+            derived = 0
+            for rule, masks, total, career_name, career_bit in engine.compiled_rules:
+                satisfied = sum((facts & mask).bit_count() for mask in masks)
+                if satisfied * 2 > total:
+                    career_scores[career_name] = max(career_scores.get(career_name, 0), satisfied / total * rule.confidence)
+                    derived |= career_bit
+            pending = bool(derived & ~facts & engine.watched)
+            facts |= derived
+            iterations += 1
+        return career_scores, iterations
+
+
+class UncertaintyBatchTests(SimpleTestCase):
+    def test_adjust_batch_matches_scalar(self):
+        engine = UncertaintyEngine()
+        bases = [i / 20 for i in range(0, 2001)]
+        for count in range(5):
+            adjusted = engine.adjust_batch(bases, count)
+            for base, confidence, level in zip(bases, adjusted['confidence_score'], adjusted['uncertainty_level']):
+                [expected] = engine.apply_uncertainty_to_recommendations([
+                    {'confidence_score': base, 'required_subjects': ['s'] * count}
+                ])
+                self.assertEqual(
+                    (int(confidence), UNCERTAINTY_LEVELS[level]),
+                    (expected['confidence_score'], expected['uncertainty_level']), (base, count)
+                )
+
+
+class FallbackBaselineTests(SimpleTestCase):
+    """Recommendations recorded from the original views.py fallback"""
+
+    def test_recommend_matches_baseline(self):
+        engine = FallbackEngine()
+        for case in _load_baseline()['fallback']:
+            student_data = dict(case['student'], subject_scores={})
+            for use_cache in (False, True):
+                recommendations = engine.recommend(student_data, use_cache=use_cache)
+                self.assertEqual([
+                    [r['career_name'], r['confidence_score'], r['reasoning'], r['salary_range'], r['growth_prospects']]
+                    for r in recommendations
+                ], case['recommendations'], case)
+
+    def test_salary_ranges_only_name_fallback_titles(self):
+        titles = {title for levels in INTEREST_CAREERS.values() for careers in levels.values() for title, _, _ in careers}
+        titles |= {title for careers in GENERAL_CAREERS.values() for title, _ in careers}
+        self.assertLessEqual(set(SALARY_RANGES), titles)
+
+
+class InferenceJobTests(TestCase):
+    def test_claim_is_exclusive(self):
+        job = jobs.enqueue(_create_assessment())
+        claimed = jobs.claim()
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (job.pk, InferenceJob.RUNNING, 1))
+        self.assertIsNone(jobs.claim())
+
+    def test_run_saves_recommendations(self):
+        assessment = _create_assessment()
+        jobs.enqueue(assessment)
+        with _quietly():
+            self.assertEqual(jobs.drain(), 1)
+        assessment.refresh_from_db()
+        self.assertEqual(assessment.inference_job.status, InferenceJob.DONE)
+        self.assertTrue(assessment.recommendation_snapshot)
+
+    def test_failures_retry_then_fail(self):
+        assessment = _create_assessment()
+        jobs.enqueue(assessment)
+        with mock.patch('counselor.views.score_assessment', side_effect=RuntimeError('boom')), _quietly():
+            for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+                job = jobs.claim()
+                self.assertEqual(job.attempts, attempt)
+                jobs.run(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (InferenceJob.FAILED, 'boom'))
+        self.assertIsNone(jobs.claim())
+
+    @override_settings(COUNSELOR_JOB_TIMEOUT=60)
+    def test_stale_jobs_are_requeued(self):
+        stale = jobs.enqueue(_create_assessment())
+        exhausted = jobs.enqueue(_create_assessment())
+        long_ago = timezone.now() - timedelta(minutes=5)
+        InferenceJob.objects.filter(pk=stale.pk).update(status=InferenceJob.RUNNING, started_at=long_ago, attempts=1)
+        InferenceJob.objects.filter(pk=exhausted.pk).update(
+            status=InferenceJob.RUNNING, started_at=long_ago, attempts=jobs.MAX_ATTEMPTS
+        )
+        jobs.requeue_stale()
+        stale.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(stale.status, InferenceJob.PENDING)
+        self.assertEqual(exhausted.status, InferenceJob.FAILED)
+
+
+def _reload_urls():
+    """Re-route counselor.urls for the current COUNSELOR_ASYNC_VIEWS"""
+    importlib.reload(urls)
+    # The root URLconf keeps a resolver over the old patterns
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+class ViewRoutingTests(SimpleTestCase):
+    def test_wsgi_serves_sync_views(self):
+        for path, view in [
+            ('/dashboard/', views.dashboard),
+            ('/api/career-suggestions/', views.api_career_suggestions),
+            (f'/results/{uuid.uuid4()}/', views.results),
+            (f'/results/{uuid.uuid4()}/status/', views.results_status),
+        ]:
+            self.assertIs(resolve(path).func, view)
+            self.assertFalse(iscoroutinefunction(resolve(path).func))
+
+
+@override_settings(COUNSELOR_ASYNC_VIEWS=True, **VIEW_SETTINGS)
+class AsyncViewTests(TestCase):
+    student = {'subject_scores': {'mathematics': 92, 'physics': 88, 'computer_science': 90}}
+
+    @classmethod
+    def setUpClass(cls):
+        # Registered before the settings override's own cleanup, so it
+        # runs once the override is undone
+        cls.addClassCleanup(_reload_urls)
+        super().setUpClass()
+        _reload_urls()
+
+    async def post_suggestions(self, client=None):
+        with _quietly():
+            return await (client or AsyncClient()).post(
+                reverse('api_career_suggestions'), json.dumps(self.student), content_type='application/json'
+            )
+
+    def test_asgi_serves_async_views(self):
+        self.assertIs(resolve('/dashboard/').func, views.async_dashboard)
+        self.assertIs(resolve('/api/career-suggestions/').func, views.async_api_career_suggestions)
+
+    async def test_suggestions(self):
+        response = await self.post_suggestions()
+        self.assertEqual(response.status_code, 200)
+        expected = get_engine().recommend(dict(self.student, personality_traits={}, career_interests=[]))[:5]
+        self.assertEqual(response.json()['recommendations'], json.loads(json.dumps(expected)))
+
+    async def test_suggestions_shed_load(self):
+        with mock.patch.object(views.inference_executor, 'run', side_effect=InferenceBusy()):
+            response = await self.post_suggestions()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    async def test_suggestions_csrf_exempt(self):
+        response = await self.post_suggestions(AsyncClient(enforce_csrf_checks=True))
+        self.assertEqual(response.status_code, 200)
+
+    async def test_results_and_status(self):
+        assessment = await StudentAssessment.objects.acreate(
+            session_id=str(uuid.uuid4()), name='Async Student', age=18, education_level='undergrad',
+            subject_scores=self.student['subject_scores'],
+            recommendation_snapshot=[{'career_name': 'Async Career', 'confidence_score': 70, 'rank': 1}],
+            scored_at=timezone.now(),
+        )
+        client = AsyncClient()
+        with _quietly():
+            response = await client.get(reverse('results', args=[assessment.session_id]))
+        self.assertContains(response, 'Async Career')
+        # AsyncClient only sends real headers passed as headers=
+        revalidated = await client.get(
+            reverse('results', args=[assessment.session_id]), headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        status = (await client.get(reverse('results_status', args=[assessment.session_id]))).json()
+        self.assertTrue(status['finished'])
+
+    async def test_dashboard_requires_login(self):
+        response = await AsyncClient().get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(COUNSELOR_INFERENCE_THREADS=1, COUNSELOR_INFERENCE_QUEUE=1)
+class InferenceExecutorTests(SimpleTestCase):
+    async def test_rejects_beyond_capacity(self):
+        executor = InferenceExecutor()
+        release = threading.Event()
+        running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with self.assertRaises(InferenceBusy):
+            await executor.run(release.wait, 5)
+        release.set()
+        self.assertEqual(await asyncio.gather(*running), [True, True])
+        self.assertEqual(executor.stats()['in_flight'], 0)
+        self.assertEqual(await executor.run(sum, (1, 2)), 3)
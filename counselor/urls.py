@@ -1,14 +1,31 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Async variants only pay off under ASGI; under WSGI each request would
+# spin up its own event loop (see ai_career_counselor/asgi.py)
+if settings.COUNSELOR_ASYNC_VIEWS:
+    results, results_status, dashboard, api_career_suggestions = (
+        views.async_results, views.async_results_status,
+        views.async_dashboard, views.async_api_career_suggestions,
+    )
+else:
+    results, results_status, dashboard, api_career_suggestions = (
+        views.results, views.results_status, views.dashboard, views.api_career_suggestions,
+    )
+
 urlpatterns = [
     path('', views.home, name='home'),
     path('about/', views.about, name='about'),
     path('assessment/', views.assessment_view, name='assessment_form'),  # single route for form
-    path('results/<uuid:session_id>/', views.results, name='results'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('results/<uuid:session_id>/', results, name='results'),
+    path('results/<uuid:session_id>/status/', results_status, name='results_status'),
+    path('dashboard/', dashboard, name='dashboard'),
+    path('api/dashboard/', views.api_dashboard, name='api_dashboard'),
     path('login/', views.user_login, name='login'),
     path('register/', views.user_register, name='register'),
     path('logout/', views.user_logout, name='logout'),
-    path('api/career-suggestions/', views.api_career_suggestions, name='api_career_suggestions'),
+    path('api/career-suggestions/', api_career_suggestions, name='api_career_suggestions'),
+    path('api/career-suggestions/batch/', views.api_career_suggestions_batch, name='api_career_suggestions_batch'),
+    path('api/timings/', views.api_timings, name='api_timings'),
 ]
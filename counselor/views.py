@@ -1,23 +1,35 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from django.urls import reverse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.db.models import OuterRef, Q, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+import base64
 import json
 import uuid
+from calendar import timegm
+from datetime import datetime
 from .forms import StudentAssessmentForm, SUBJECT_CHOICES
-from .models import StudentAssessment, CareerRecommendation, Career
+from .models import StudentAssessment, CareerRecommendation, Career, InferenceJob
 from .auth_forms import CustomUserCreationForm, LoginForm
-from .models import StudentAssessment, CareerRecommendation, Career
+from . import http_cache, jobs
+from .async_utils import InferenceBusy, aget_user, async_csrf_exempt, async_login_required, inference_executor
+from .ndjson import dumps_line, iter_request_items
+from .recommendation_store import save_recommendation_sets
+from .ai_engine.fallback_engine import fallback_engine
+from .ai_engine import timing
+from .ai_engine.timing import span
 
 # Import AI engines with error handling
 try:
-    from .ai_engine.knowledge_base import KnowledgeBase
-    from .ai_engine.fopl_rules import FOPLRuleEngine
-    from .ai_engine.inference_engine import ForwardChainingEngine
-    from .ai_engine.uncertainty_engine import UncertaintyEngine
+    from .ai_engine.career_engine import get_engine
     AI_ENGINES_AVAILABLE = True
 except ImportError:
     AI_ENGINES_AVAILABLE = False
@@ -37,36 +49,37 @@ def assessment(request):
     """Enhanced assessment form view with AI integration"""
     if request.method == 'POST':
         try:
-            # Get basic form data
-            name = request.POST.get('name')
-            age = request.POST.get('age')
-            education_level = request.POST.get('education_level')
-            interests = request.POST.getlist('interests')
-            
-            # Get subject scores
-            subject_scores = {}
-            subject_fields = [
-                'mathematics', 'physics', 'chemistry', 'biology', 'computer_science',
-                'english', 'history', 'economics', 'business_studies', 'art'
-            ]
-            
-            for subject in subject_fields:
-                score = request.POST.get(f'score_{subject}')
-                if score and score.strip():  # Only add if score is provided
-                    try:
-                        subject_scores[subject] = int(score)
-                    except ValueError:
-                        pass  # Skip invalid scores
-            
-            # Get personality traits
-            personality_traits = {
-                'problem_solving': request.POST.get('enjoys_problem_solving') == 'on',
-                'social': request.POST.get('prefers_working_with_people') == 'on',
-                'creative': request.POST.get('enjoys_creative_activities') == 'on',
-                'leadership': request.POST.get('likes_leadership_roles') == 'on',
-                'helping': request.POST.get('interested_in_helping_others') == 'on',
-                'analytical': request.POST.get('enjoys_analytical_thinking') == 'on',
-            }
+            with span('form'):
+                # Get basic form data
+                name = request.POST.get('name')
+                age = request.POST.get('age')
+                education_level = request.POST.get('education_level')
+                interests = request.POST.getlist('interests')
+            
+                # Get subject scores
+                subject_scores = {}
+                subject_fields = [
+                    'mathematics', 'physics', 'chemistry', 'biology', 'computer_science',
+                    'english', 'history', 'economics', 'business_studies', 'art'
+                ]
+            
+                for subject in subject_fields:
+                    score = request.POST.get(f'score_{subject}')
+                    if score and score.strip():  # Only add if score is provided
+                        try:
+                            subject_scores[subject] = int(score)
+                        except ValueError:
+                            pass  # Skip invalid scores
+            
+                # Get personality traits
+                personality_traits = {
+                    'problem_solving': request.POST.get('enjoys_problem_solving') == 'on',
+                    'social': request.POST.get('prefers_working_with_people') == 'on',
+                    'creative': request.POST.get('enjoys_creative_activities') == 'on',
+                    'leadership': request.POST.get('likes_leadership_roles') == 'on',
+                    'helping': request.POST.get('interested_in_helping_others') == 'on',
+                    'analytical': request.POST.get('enjoys_analytical_thinking') == 'on',
+                }
             
             print(f"Collected data: name={name}, age={age}, education={education_level}")
             print(f"Subject scores: {subject_scores}")
@@ -77,26 +90,27 @@ def assessment(request):
             session_id = str(uuid.uuid4())
             
             # Create assessment
-            assessment_obj = StudentAssessment.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                session_id=session_id,
-                name=name,
-                age=int(age),
-                education_level=education_level,
-                subject_scores=subject_scores,
-                personality_traits=personality_traits,
-                career_interests=interests
-            )
+            with span('insert'), transaction.atomic():
+                assessment_obj = StudentAssessment.objects.create(
+                    user=request.user if request.user.is_authenticated else None,
+                    session_id=session_id,
+                    name=name,
+                    age=int(age),
+                    education_level=education_level,
+                    subject_scores=subject_scores,
+                    personality_traits=personality_traits,
+                    career_interests=interests
+                )
+                if jobs.async_enabled():
+                    # Scored by the worker pool; the results page waits for it
+                    jobs.enqueue(assessment_obj)
             
             print(f"Created assessment: {assessment_obj.id}")
             
-            # Run AI inference - choose method based on available data
-            if subject_scores:
-                print("Using AI engines (subject scores available)")
-                recommendations = run_advanced_ai_inference(assessment_obj)
-            else:
-                print("Using fallback inference (no subject scores)")
-                recommendations = run_career_inference(assessment_obj)
+            if jobs.async_enabled():
+                return redirect('results', session_id=session_id)
+            
+            recommendations = score_assessment(assessment_obj)
             
             print(f"Generated {len(recommendations)} recommendations")
             
@@ -114,43 +128,38 @@ def assessment(request):
             return render(request, 'counselor/assessment_form.html')
     
     # GET request - show form
-    return render(request, 'counselor/assessment_form.html')
+    with span('render'):
+        return render(request, 'counselor/assessment_form.html')
+
+def score_assessment(assessment):
+    """Run AI inference - choose method based on available data"""
+    if assessment.subject_scores:
+        print("Using AI engines (subject scores available)")
+        return run_advanced_ai_inference(assessment)
+    print("Using fallback inference (no subject scores)")
+    return run_career_inference(assessment)
 
 def run_advanced_ai_inference(assessment):
     """Run the advanced AI inference using FOPL engines"""
-    student_data = {
-        'subject_scores': assessment.subject_scores,
-        'personality_traits': assessment.personality_traits,
-        'career_interests': assessment.career_interests,
-        'age': assessment.age,
-        'education_level': assessment.education_level
-    }
+    student_data = assessment.to_student_data()
     
     print(f"Running advanced AI inference with data: {student_data}")
     
     if AI_ENGINES_AVAILABLE:
         try:
-            # Initialize AI components
-            kb = KnowledgeBase()
-            fopl_engine = FOPLRuleEngine(kb)
-            inference_engine = ForwardChainingEngine(kb, fopl_engine)
-            uncertainty_engine = UncertaintyEngine()
-            
-            print("AI engines initialized successfully")
-            
-            # Run inference
-            recommendations = inference_engine.infer_careers(student_data)
-            print(f"Inference engine returned {len(recommendations)} recommendations")
-            
-            # Apply uncertainty if available
+            # Shared engine, compiled once per worker process; identical
+            # profiles are answered from the inference cache
+            engine = get_engine()
             try:
-                adjusted_recommendations = uncertainty_engine.apply_uncertainty_to_recommendations(recommendations)
-                print(f"Uncertainty engine adjusted to {len(adjusted_recommendations)} recommendations")
-                return adjusted_recommendations
+                recommendations = engine.recommend(student_data)
             except Exception as e:
+                # Inference is re-run on its own: if it succeeds, only the
+                # uncertainty step failed and the raw recommendations are used
+                recommendations = engine.infer_careers(student_data)
                 print(f"Uncertainty engine error: {e}, using raw recommendations")
-                return recommendations
-                
+            print(f"Inference engine returned {len(recommendations)} recommendations")
+            return recommendations
+
         except Exception as e:
             print(f"AI Engine error: {e}")
             import traceback
@@ -160,126 +169,195 @@ def run_advanced_ai_inference(assessment):
         print("AI engines not available, using fallback")
         return fallback_career_inference(student_data)
 
-def enhanced_fallback_career_inference(student_data):
-    """Enhanced fallback that can use subject scores if available"""
-    recommendations = []
-    
-    subject_scores = student_data.get('subject_scores', {})
-    interests = student_data.get('career_interests', [])
-    personality = student_data.get('personality_traits', {})
-    education_level = student_data.get('education_level', 'highschool')
+def _with_validators(response, etag, last_modified):
+    """Attach the results page validators and caching headers"""
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+def _results_request_state(request):
+    """Viewer cache variant and whether flash messages are pending (session access is sync)"""
+    return http_cache.viewer_variant(request), not messages.get_messages(request)
+
+def _snapshot_source(assessment):
+    """Recommendation rows a missing snapshot is built from"""
+    return (
+        CareerRecommendation.objects.filter(assessment=assessment)
+        .select_related('career').order_by('rank')
+    )
+
+def _results_context(assessment, recommendations, session_id):
+    return {
+        'assessment': assessment,
+        'recommendations': recommendations,
+        'session_id': session_id,
+        'interests': assessment.career_interests if assessment.career_interests else []
+    }
+
+def results(request, session_id):
+    """Display career recommendations"""
+    session_id = str(session_id)
+    # Pending flash messages are rendered into the page, so bypass the cache
+    variant, cacheable = _results_request_state(request)
     
-    print(f"Enhanced fallback - Subject scores: {len(subject_scores)}, Interests: {interests}")
+    if cacheable:
+        validators = http_cache.get_validators(session_id)
+        if validators:
+            stamp, last_modified = validators
+            etag = http_cache.results_etag(session_id, stamp, variant)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                content = http_cache.get_page(session_id, etag)
+                if content is not None:
+                    response = HttpResponse(content)
+            if response is not None:
+                return _with_validators(response, etag, last_modified)
     
-    # If we have subject scores, use them for more accurate recommendations
-    if subject_scores:
-        # Technology careers based on subject performance
-        if (subject_scores.get('mathematics', 0) >= 75 and 
-            subject_scores.get('computer_science', 0) >= 75):
-            recommendations.append({
-                'career_name': 'Software Engineer',
-                'confidence_score': 90,
-                'reasoning': f"Excellent in Mathematics ({subject_scores.get('mathematics', 0)}%) and Computer Science ({subject_scores.get('computer_science', 0)}%)",
-                'category': 'Technology',
-                'description': 'Design and develop software applications',
-                'salary_range': '$70,000 - $120,000',
-                'growth_prospects': 'High'
-            })
-        
-        # Medical careers
-        if (subject_scores.get('biology', 0) >= 80 and 
-            subject_scores.get('chemistry', 0) >= 80 and
-            subject_scores.get('physics', 0) >= 70):
-            recommendations.append({
-                'career_name': 'Medical Doctor',
-                'confidence_score': 92,
-                'reasoning': f"Outstanding performance in Biology ({subject_scores.get('biology', 0)}%), Chemistry ({subject_scores.get('chemistry', 0)}%), and Physics ({subject_scores.get('physics', 0)}%)",
-                'category': 'Healthcare',
-                'description': 'Diagnose and treat patients',
-                'salary_range': '$150,000 - $300,000',
-                'growth_prospects': 'High'
-            })
+    try:
+        assessment = StudentAssessment.objects.get(session_id=session_id)
+        recommendations = assessment.recommendation_snapshot
         
-        # Engineering careers
-        if (subject_scores.get('mathematics', 0) >= 75 and 
-            subject_scores.get('physics', 0) >= 75):
-            recommendations.append({
-                'career_name': 'Mechanical Engineer',
-                'confidence_score': 88,
-                'reasoning': f"Strong foundation in Mathematics ({subject_scores.get('mathematics', 0)}%) and Physics ({subject_scores.get('physics', 0)}%)",
-                'category': 'Engineering',
-                'description': 'Design and build mechanical systems',
-                'salary_range': '$70,000 - $115,000',
-                'growth_prospects': 'High'
-            })
+        if recommendations is None:
+            # No snapshot yet: saved before snapshots existed (build it
+            # once) or not scored yet
+            recommendations = [rec.to_snapshot() for rec in _snapshot_source(assessment)]
+            if recommendations:
+                StudentAssessment.objects.filter(pk=assessment.pk).update(
+                    recommendation_snapshot=recommendations
+                )
+            else:
+                job = InferenceJob.objects.filter(assessment=assessment).first()
+                if job is not None and job.status != InferenceJob.DONE:
+                    return _pending_results(request, assessment, job)
         
-        # Business/Finance careers
-        if (subject_scores.get('mathematics', 0) >= 70 and 
-            subject_scores.get('economics', 0) >= 70):
-            recommendations.append({
-                'career_name': 'Financial Analyst',
-                'confidence_score': 85,
-                'reasoning': f"Good analytical skills shown in Mathematics ({subject_scores.get('mathematics', 0)}%) and Economics ({subject_scores.get('economics', 0)}%)",
-                'category': 'Finance',
-                'description': 'Analyze financial data and investments',
-                'salary_range': '$60,000 - $95,000',
-                'growth_prospects': 'Medium'
-            })
+        print(f"Found assessment: {assessment.name}, {len(recommendations)} recommendations")
         
-        # Creative careers
-        if subject_scores.get('art', 0) >= 70:
-            recommendations.append({
-                'career_name': 'Graphic Designer',
-                'confidence_score': 82,
-                'reasoning': f"Creative talent demonstrated in Art ({subject_scores.get('art', 0)}%)",
-                'category': 'Creative',
-                'description': 'Create visual designs and artwork',
-                'salary_range': '$40,000 - $70,000',
-                'growth_prospects': 'Medium'
-            })
+        stamp, modified = http_cache.assessment_validators(assessment)
+        last_modified = timegm(modified.utctimetuple())
+        etag = http_cache.results_etag(session_id, stamp, variant)
+        if cacheable:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                return _with_validators(response, etag, last_modified)
         
-        # Education careers
-        if subject_scores.get('english', 0) >= 75:
-            recommendations.append({
-                'career_name': 'Teacher',
-                'confidence_score': 80,
-                'reasoning': f"Strong communication skills shown in English ({subject_scores.get('english', 0)}%)",
-                'category': 'Education',
-                'description': 'Educate and inspire students',
-                'salary_range': '$40,000 - $65,000',
-                'growth_prospects': 'Medium'
-            })
+        context = _results_context(assessment, recommendations, session_id)
+        with span('render'):
+            response = render(request, 'counselor/results.html', context)
+        if cacheable:
+            http_cache.store_page(session_id, stamp, last_modified, etag, response.content)
+        return _with_validators(response, etag, last_modified)
     
-    # If no recommendations from subject scores, fall back to interest-based recommendations
-    if not recommendations:
-        recommendations = fallback_career_inference(student_data)
+    except StudentAssessment.DoesNotExist:
+        print(f"Assessment not found for session_id: {session_id}")
+        messages.error(request, "Assessment not found.")
+        return redirect('assessment')
+
+async def async_results(request, session_id):
+    """Async variant of results, served under ASGI"""
+    session_id = str(session_id)
+    # Pending flash messages are rendered into the page, so bypass the cache
+    variant, cacheable = await sync_to_async(_results_request_state)(request)
     
-    # Sort by confidence score
-    recommendations.sort(key=lambda x: x['confidence_score'], reverse=True)
+    if cacheable:
+        validators = await http_cache.aget_validators(session_id)
+        if validators:
+            stamp, last_modified = validators
+            etag = http_cache.results_etag(session_id, stamp, variant)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                content = await http_cache.aget_page(session_id, etag)
+                if content is not None:
+                    response = HttpResponse(content)
+            if response is not None:
+                return _with_validators(response, etag, last_modified)
     
-    return recommendations[:8]
-def results(request, session_id):
-    """Display career recommendations"""
     try:
-        assessment = StudentAssessment.objects.get(session_id=session_id)
-        recommendations = CareerRecommendation.objects.filter(assessment=assessment).order_by('rank')
+        assessment = await StudentAssessment.objects.aget(session_id=session_id)
+        recommendations = assessment.recommendation_snapshot
+        
+        if recommendations is None:
+            # No snapshot yet: saved before snapshots existed (build it
+            # once) or not scored yet
+            recommendations = [rec.to_snapshot() async for rec in _snapshot_source(assessment)]
+            if recommendations:
+                await StudentAssessment.objects.filter(pk=assessment.pk).aupdate(
+                    recommendation_snapshot=recommendations
+                )
+            else:
+                job = await InferenceJob.objects.filter(assessment=assessment).afirst()
+                if job is not None and job.status != InferenceJob.DONE:
+                    return await sync_to_async(_pending_results)(request, assessment, job)
         
         print(f"Found assessment: {assessment.name}, {len(recommendations)} recommendations")
         
-        context = {
-            'assessment': assessment,
-            'recommendations': recommendations,
-            'session_id': session_id,
-            'interests': assessment.career_interests if assessment.career_interests else []
-        }
+        stamp, modified = http_cache.assessment_validators(assessment)
+        last_modified = timegm(modified.utctimetuple())
+        etag = http_cache.results_etag(session_id, stamp, variant)
+        if cacheable:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                return _with_validators(response, etag, last_modified)
+        
+        context = _results_context(assessment, recommendations, session_id)
         
-        return render(request, 'counselor/results.html', context)
+        # Templates and context processors touch the session, so render in a thread
+        with span('render'):
+            response = await sync_to_async(render)(request, 'counselor/results.html', context)
+        if cacheable:
+            await http_cache.astore_page(session_id, stamp, last_modified, etag, response.content)
+        return _with_validators(response, etag, last_modified)
     
     except StudentAssessment.DoesNotExist:
         print(f"Assessment not found for session_id: {session_id}")
-        messages.error(request, "Assessment not found.")
+        await sync_to_async(messages.error)(request, "Assessment not found.")
         return redirect('assessment')
 
+def _pending_results(request, assessment, job):
+    """Placeholder results page polling results_status until scoring ends"""
+    if not job.is_finished:
+        jobs.pool.start()  # Picks up jobs queued before a restart
+    response = render(request, 'counselor/results_pending.html', {
+        'assessment': assessment,
+        'failed': job.status == InferenceJob.FAILED,
+        'status_url': reverse('results_status', args=[assessment.session_id]),
+        'poll_interval_ms': int(jobs.poll_interval() * 1000),
+    })
+    patch_cache_control(response, no_cache=True, no_store=True)
+    return response
+
+def _status_response(row):
+    if row is None:
+        return JsonResponse({'success': False, 'error': 'Assessment not found'}, status=404)
+    # Assessments scored during the request have no job
+    status = row[1] or InferenceJob.DONE
+    response = JsonResponse({
+        'success': True,
+        'status': status,
+        'finished': status in (InferenceJob.DONE, InferenceJob.FAILED)
+    })
+    patch_cache_control(response, no_cache=True, no_store=True)
+    return response
+
+def _status_row(session_id):
+    return (
+        StudentAssessment.objects.filter(session_id=str(session_id))
+        .values_list('pk', 'inference_job__status')
+    )
+
+def results_status(request, session_id):
+    """Scoring status of an assessment, polled by the pending results page"""
+    return _status_response(_status_row(session_id).first())
+
+async def async_results_status(request, session_id):
+    """Async variant of results_status, served under ASGI"""
+    return _status_response(await _status_row(session_id).afirst())
+
+def _engine_recommend(student_data):
+    # Runs on the inference executor, which also absorbs the first engine build
+    return get_engine().recommend(student_data)
+
 @csrf_exempt
 def api_career_suggestions(request):
     """API endpoint for getting career suggestions"""
@@ -288,22 +366,12 @@ def api_career_suggestions(request):
             data = json.loads(request.body)
             
             # Create temporary assessment data
-            student_data = {
-                'subject_scores': data.get('subject_scores', {}),
-                'personality_traits': data.get('personality_traits', {}),
-                'career_interests': data.get('career_interests', [])
-            }
+            student_data = _api_student_data(data)
             
             # Run inference
             if AI_ENGINES_AVAILABLE:
                 try:
-                    kb = KnowledgeBase()
-                    fopl_engine = FOPLRuleEngine(kb)
-                    inference_engine = ForwardChainingEngine(kb, fopl_engine)
-                    uncertainty_engine = UncertaintyEngine()
-                    
-                    recommendations = inference_engine.infer_careers(student_data)
-                    adjusted_recommendations = uncertainty_engine.apply_uncertainty_to_recommendations(recommendations)
+                    adjusted_recommendations = get_engine().recommend(student_data)
                 except Exception as e:
                     print(f"AI Engine error: {e}")
                     adjusted_recommendations = fallback_career_inference(student_data)
@@ -323,32 +391,140 @@ def api_career_suggestions(request):
     
     return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
+@async_csrf_exempt
+async def async_api_career_suggestions(request):
+    """Async variant of api_career_suggestions, served under ASGI"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            
+            # Create temporary assessment data
+            student_data = _api_student_data(data)
+            
+            # Run inference on the bounded executor, off the event loop
+            if AI_ENGINES_AVAILABLE:
+                try:
+                    adjusted_recommendations = await inference_executor.run(
+                        _engine_recommend, student_data
+                    )
+                except InferenceBusy:
+                    response = JsonResponse({
+                        'success': False,
+                        'error': 'Server busy, please retry'
+                    }, status=503)
+                    response['Retry-After'] = '1'
+                    return response
+                except Exception as e:
+                    print(f"AI Engine error: {e}")
+                    adjusted_recommendations = fallback_career_inference(student_data)
+            else:
+                adjusted_recommendations = fallback_career_inference(student_data)
+            
+            return JsonResponse({
+                'success': True,
+                'recommendations': adjusted_recommendations[:5]  # Top 5
+            })
+        
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            })
+    
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+def _api_student_data(data):
+    """student_data dict for one API request item"""
+    return {
+        'subject_scores': data.get('subject_scores', {}),
+        'personality_traits': data.get('personality_traits', {}),
+        'career_interests': data.get('career_interests', [])
+    }
+
+def _validate_api_student(data):
+    """Reject batch items the scorer cannot handle"""
+    if not isinstance(data, dict):
+        raise ValueError("Each student must be a JSON object")
+    subject_scores = data.get('subject_scores', {})
+    if not isinstance(subject_scores, dict):
+        raise ValueError("subject_scores must be an object")
+    for subject, score in subject_scores.items():
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            raise ValueError(f"Score for {subject} must be a number")
+
+BATCH_CHUNK_SIZE = 256
+
+def _score_batch_chunk(chunk):
+    """Score one chunk of (index, student_data, error) and yield NDJSON lines"""
+    valid = [student_data for _, student_data, error in chunk if error is None]
+    results = []
+    if valid:
+        if AI_ENGINES_AVAILABLE:
+            try:
+                engine = get_engine()
+                results = engine.recommend_batch(valid, limit=5)
+            except Exception as e:
+                print(f"AI Engine error: {e}")
+                results = [fallback_career_inference(student_data) for student_data in valid]
+        else:
+            results = [fallback_career_inference(student_data) for student_data in valid]
+    
+    results = iter(results)
+    for index, _, error in chunk:
+        if error is None:
+            yield dumps_line({'index': index, 'success': True, 'recommendations': next(results)[:5]})
+        else:
+            yield dumps_line({'index': index, 'success': False, 'error': error})
+
+def _batch_suggestion_lines(items):
+    """Stream NDJSON results, scoring BATCH_CHUNK_SIZE students at a time"""
+    chunk = []
+    index = 0
+    try:
+        for item in items:
+            try:
+                _validate_api_student(item)
+                chunk.append((index, _api_student_data(item), None))
+            except ValueError as e:
+                chunk.append((index, None, str(e)))
+            index += 1
+            
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                yield from _score_batch_chunk(chunk)
+                chunk = []
+    except ValueError as e:
+        # Malformed body: report what was scored so far, then stop
+        yield from _score_batch_chunk(chunk)
+        yield dumps_line({'index': index, 'success': False, 'error': f"Invalid request body: {e}"})
+        return
+    
+    yield from _score_batch_chunk(chunk)
+
+@csrf_exempt
+def api_career_suggestions_batch(request):
+    """
+    Batch API: accepts a JSON array or NDJSON body of students and streams
+    one NDJSON result line per student as it is computed
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'})
+    
+    return StreamingHttpResponse(
+        _batch_suggestion_lines(iter_request_items(request)),
+        content_type='application/x-ndjson'
+    )
+
 def run_career_inference(assessment):
     """Run the AI career inference system"""
     # Prepare student data
-    student_data = {
-        'subject_scores': assessment.subject_scores,
-        'personality_traits': assessment.personality_traits,
-        'career_interests': assessment.career_interests,
-        'age': assessment.age,
-        'education_level': assessment.education_level
-    }
+    student_data = assessment.to_student_data()
     
     print(f"Running inference with data: {student_data}")
     
     if AI_ENGINES_AVAILABLE:
         try:
-            # Initialize AI components
-            kb = KnowledgeBase()
-            fopl_engine = FOPLRuleEngine(kb)
-            inference_engine = ForwardChainingEngine(kb, fopl_engine)
-            uncertainty_engine = UncertaintyEngine()
-            
-            # Run inference
-            recommendations = inference_engine.infer_careers(student_data)
-            adjusted_recommendations = uncertainty_engine.apply_uncertainty_to_recommendations(recommendations)
-            
-            return adjusted_recommendations
+            # Run inference on the shared engine
+            return get_engine().recommend(student_data)
         except Exception as e:
             print(f"AI Engine error: {e}")
             return fallback_career_inference(student_data)
@@ -356,420 +532,19 @@ def run_career_inference(assessment):
         print("Using fallback inference")
         return fallback_career_inference(student_data)
 
-def enhanced_fallback_career_inference(student_data):
-    """Enhanced fallback with DYNAMIC scoring based on actual performance"""
-    recommendations = []
-    
-    subject_scores = student_data.get('subject_scores', {})
-    interests = student_data.get('career_interests', [])
-    personality = student_data.get('personality_traits', {})
-    education_level = student_data.get('education_level', 'highschool')
-    
-    print(f"Enhanced fallback - Subject scores: {subject_scores}")
-    
-    if subject_scores:
-        # SOFTWARE ENGINEERING - Calculate average of relevant subjects
-        math = subject_scores.get('mathematics', 0)
-        cs = subject_scores.get('computer_science', 0)
-        
-        if math >= 60 and cs >= 60:
-            # Base score is average of the two subjects
-            base_score = (math + cs) / 2
-            
-            # Small personality bonuses (max +8)
-            if personality.get('analytical', False):
-                base_score += 3
-            if personality.get('problem_solving', False):
-                base_score += 3
-            if personality.get('creative', False):
-                base_score += 2
-            
-            # Cap at 95
-            final_score = min(int(base_score), 95)
-            
-            recommendations.append({
-                'career_name': 'Software Engineer',
-                'confidence_score': final_score,
-                'reasoning': f"Strong in Mathematics ({math}%) and Computer Science ({cs}%)",
-                'category': 'Technology',
-                'description': 'Design and develop software applications',
-                'salary_range': '$70,000 - $120,000',
-                'growth_prospects': 'High'
-            })
-        
-        # MEDICAL DOCTOR - Average of bio, chem, physics
-        bio = subject_scores.get('biology', 0)
-        chem = subject_scores.get('chemistry', 0)
-        phys = subject_scores.get('physics', 0)
-        
-        if bio >= 65 and chem >= 65 and phys >= 60:
-            base_score = (bio + chem + phys) / 3
-            
-            if personality.get('helping', False):
-                base_score += 4
-            if personality.get('analytical', False):
-                base_score += 3
-            
-            final_score = min(int(base_score), 95)
-            
-            recommendations.append({
-                'career_name': 'Medical Doctor',
-                'confidence_score': final_score,
-                'reasoning': f"Strong performance in Biology ({bio}%), Chemistry ({chem}%), Physics ({phys}%)",
-                'category': 'Healthcare',
-                'description': 'Diagnose and treat patients',
-                'salary_range': '$150,000 - $300,000',
-                'growth_prospects': 'High'
-            })
-        
-        # MECHANICAL ENGINEER - Math + Physics average
-        if math >= 60 and phys >= 60:
-            base_score = (math + phys) / 2
-            
-            if personality.get('problem_solving', False):
-                base_score += 3
-            if personality.get('analytical', False):
-                base_score += 2
-            
-            final_score = min(int(base_score), 95)
-            
-            recommendations.append({
-                'career_name': 'Mechanical Engineer',
-                'confidence_score': final_score,
-                'reasoning': f"Solid foundation in Mathematics ({math}%) and Physics ({phys}%)",
-                'category': 'Engineering',
-                'description': 'Design and build mechanical systems',
-                'salary_range': '$70,000 - $115,000',
-                'growth_prospects': 'High'
-            })
-        
-        # FINANCIAL ANALYST - Math + Economics
-        econ = subject_scores.get('economics', 0)
-        
-        if math >= 60 and econ >= 60:
-            base_score = (math + econ) / 2
-            
-            if personality.get('analytical', False):
-                base_score += 3
-            if personality.get('leadership', False):
-                base_score += 2
-            
-            final_score = min(int(base_score), 95)
-            
-            recommendations.append({
-                'career_name': 'Financial Analyst',
-                'confidence_score': final_score,
-                'reasoning': f"Good analytical skills in Mathematics ({math}%) and Economics ({econ}%)",
-                'category': 'Finance',
-                'description': 'Analyze financial data and investments',
-                'salary_range': '$60,000 - $95,000',
-                'growth_prospects': 'Medium'
-            })
-        
-        # GRAPHIC DESIGNER - Art score
-        art = subject_scores.get('art', 0)
-        
-        if art >= 55:
-            base_score = art
-            
-            if personality.get('creative', False):
-                base_score += 5
-            
-            final_score = min(int(base_score), 95)
-            
-            recommendations.append({
-                'career_name': 'Graphic Designer',
-                'confidence_score': final_score,
-                'reasoning': f"Creative talent in Art ({art}%)",
-                'category': 'Creative',
-                'description': 'Create visual designs and artwork',
-                'salary_range': '$40,000 - $70,000',
-                'growth_prospects': 'Medium'
-            })
-        
-        # DATA SCIENTIST - Math + CS + some stat thinking
-        if math >= 70 and cs >= 65:
-            base_score = (math + cs) / 2
-            
-            if personality.get('analytical', False):
-                base_score += 4
-            if personality.get('problem_solving', False):
-                base_score += 3
-            
-            final_score = min(int(base_score), 95)
-            
-            recommendations.append({
-                'career_name': 'Data Scientist',
-                'confidence_score': final_score,
-                'reasoning': f"Strong analytical skills in Mathematics ({math}%) and Computer Science ({cs}%)",
-                'category': 'Technology',
-                'description': 'Analyze complex data to help organizations make decisions',
-                'salary_range': '$80,000 - $140,000',
-                'growth_prospects': 'High'
-            })
-        
-        # TEACHER - English or best subject score
-        english = subject_scores.get('english', 0)
-        
-        if english >= 60:
-            base_score = english
-            
-            if personality.get('helping', False):
-                base_score += 4
-            if personality.get('social', False):
-                base_score += 3
-            
-            final_score = min(int(base_score), 95)
-            
-            recommendations.append({
-                'career_name': 'Teacher',
-                'confidence_score': final_score,
-                'reasoning': f"Strong communication skills in English ({english}%)",
-                'category': 'Education',
-                'description': 'Educate and inspire students',
-                'salary_range': '$40,000 - $65,000',
-                'growth_prospects': 'Medium'
-            })
-    
-    # If no recommendations from subject scores, use fallback
-    if not recommendations:
-        recommendations = fallback_career_inference(student_data)
-    
-    # Sort by confidence score and return top 8
-    recommendations.sort(key=lambda x: x['confidence_score'], reverse=True)
-    return recommendations[:8]
-
-
 def fallback_career_inference(student_data):
-    """Fallback with REALISTIC base scores (50-75 range)"""
-    recommendations = []
-    
-    subject_scores = student_data.get('subject_scores', {})
-    interests = student_data.get('career_interests', [])
-    personality = student_data.get('personality_traits', {})
-    education_level = student_data.get('education_level', 'highschool')
-    age = student_data.get('age', 18)
-    
-    # REALISTIC base scores based on education level
-    career_mappings = {
-        'engineering': {
-            'highschool': [
-                ('Software Developer Trainee', 55, 'Entry-level programming'),
-                ('Engineering Technician', 52, 'Technical support role'),
-                ('CAD Drafter', 54, 'Technical drawing'),
-                ('IT Support Specialist', 50, 'Computer support')
-            ],
-            'undergrad': [
-                ('Software Engineer', 68, 'Full-stack development'),
-                ('Mechanical Engineer', 66, 'Design and manufacturing'),
-                ('Civil Engineer', 65, 'Infrastructure projects'),
-                ('Electrical Engineer', 67, 'Electronics systems'),
-                ('Data Engineer', 64, 'Big data infrastructure')
-            ],
-            'postgrad': [
-                ('Senior Software Architect', 75, 'Advanced system design'),
-                ('Research Engineer', 73, 'Technology research'),
-                ('Engineering Manager', 72, 'Technical leadership'),
-                ('AI/ML Engineer', 74, 'Machine learning'),
-                ('Principal Engineer', 71, 'Technical strategy')
-            ]
-        },
-        'science': {
-            'highschool': [
-                ('Lab Technician', 52, 'Laboratory support'),
-                ('Medical Assistant', 54, 'Healthcare support'),
-                ('Science Teacher Assistant', 50, 'Educational support'),
-            ],
-            'undergrad': [
-                ('Research Scientist', 66, 'Scientific research'),
-                ('Data Analyst', 64, 'Statistical analysis'),
-                ('Environmental Scientist', 63, 'Environmental protection'),
-                ('Biologist', 65, 'Life sciences research'),
-            ],
-            'postgrad': [
-                ('Senior Research Scientist', 73, 'Research leadership'),
-                ('Principal Investigator', 75, 'Grant-funded research'),
-                ('Science Director', 72, 'Science management'),
-                ('Medical Researcher', 74, 'Biomedical research'),
-            ]
-        },
-        'business': {
-            'highschool': [
-                ('Sales Representative', 48, 'Product sales'),
-                ('Customer Service Manager', 50, 'Customer support'),
-                ('Office Manager', 52, 'Administrative support'),
-            ],
-            'undergrad': [
-                ('Business Analyst', 62, 'Business process analysis'),
-                ('Marketing Manager', 64, 'Brand management'),
-                ('Financial Advisor', 63, 'Financial planning'),
-                ('Project Manager', 66, 'Project coordination'),
-            ],
-            'postgrad': [
-                ('Business Consultant', 70, 'Strategic advisory'),
-                ('Strategy Director', 73, 'Corporate strategy'),
-                ('Investment Manager', 72, 'Portfolio management'),
-                ('Management Consultant', 71, 'Organizational transformation'),
-            ]
-        },
-        'arts': {
-            'highschool': [
-                ('Graphic Design Assistant', 50, 'Visual design support'),
-                ('Creative Assistant', 52, 'Creative projects'),
-                ('Social Media Creator', 54, 'Content creation'),
-            ],
-            'undergrad': [
-                ('UX/UI Designer', 66, 'User experience design'),
-                ('Art Director', 64, 'Creative direction'),
-                ('Creative Writer', 62, 'Content writing'),
-                ('Brand Designer', 63, 'Brand identity'),
-            ],
-            'postgrad': [
-                ('Creative Director', 72, 'Creative leadership'),
-                ('Art Gallery Owner', 70, 'Art business'),
-                ('Professor of Arts', 69, 'Arts education'),
-                ('Design Strategist', 73, 'Design thinking'),
-            ]
-        }
-    }
-    
-    # Generate recommendations
-    for interest in interests:
-        if interest in career_mappings:
-            careers = career_mappings[interest].get(education_level, [])
-            for career_title, base_score, description in careers:
-                adjusted_score = base_score
-                
-                # Personality adjustments (max +10 total)
-                if interest == 'engineering':
-                    if personality.get('analytical', False):
-                        adjusted_score += 4
-                    if personality.get('problem_solving', False):
-                        adjusted_score += 4
-                elif interest == 'science':
-                    if personality.get('analytical', False):
-                        adjusted_score += 3
-                    if personality.get('helping', False):
-                        adjusted_score += 3
-                elif interest == 'business':
-                    if personality.get('leadership', False):
-                        adjusted_score += 4
-                    if personality.get('social', False):
-                        adjusted_score += 3
-                elif interest == 'arts':
-                    if personality.get('creative', False):
-                        adjusted_score += 5
-                
-                # Small age bonus
-                if age < 25 and interest in ['engineering', 'science']:
-                    adjusted_score += 2
-                
-                # Cap at 85 for interest-only matches
-                adjusted_score = min(adjusted_score, 85)
-                
-                recommendations.append({
-                    'career_name': career_title,
-                    'confidence_score': int(adjusted_score),
-                    'reasoning': f"{description}. Matches {interest} interest and {education_level} level.",
-                    'category': interest.title(),
-                    'description': description,
-                    'salary_range': get_salary_range(career_title),
-                    'growth_prospects': 'High' if adjusted_score > 70 else 'Medium'
-                })
-    
-    # General recommendations if no interests
-    if not recommendations:
-        general = {
-            'highschool': [('Customer Service Representative', 45), ('Administrative Assistant', 47)],
-            'undergrad': [('Business Analyst', 58), ('Project Coordinator', 60)],
-            'postgrad': [('Management Consultant', 68), ('Research Analyst', 66)]
-        }
-        
-        for career_title, score in general.get(education_level, general['undergrad']):
-            recommendations.append({
-                'career_name': career_title,
-                'confidence_score': score,
-                'reasoning': f"General match for {education_level} education",
-                'category': 'General',
-                'description': 'Professional career path',
-                'salary_range': get_salary_range(career_title),
-                'growth_prospects': 'Medium'
-            })
-    
-    # Remove duplicates
-    seen = set()
-    unique = []
-    for rec in recommendations:
-        if rec['career_name'] not in seen:
-            seen.add(rec['career_name'])
-            unique.append(rec)
-    
-    unique.sort(key=lambda x: x['confidence_score'], reverse=True)
-    return unique[:8]
-
-def get_salary_range(career_title):
-    """Get salary range for a career"""
-    salary_ranges = {
-        # Technology
-        'Software Engineer': '$70,000 - $120,000',
-        'Software Developer Trainee': '$40,000 - $60,000',
-        'Data Engineer': '$75,000 - $130,000',
-        'AI/ML Engineer': '$90,000 - $160,000',
-        'Senior Software Architect': '$120,000 - $200,000',
-        'IT Support Specialist': '$35,000 - $55,000',
-        
-        # Business
-        'Business Analyst': '$60,000 - $95,000',
-        'Marketing Manager': '$65,000 - $110,000',
-        'Project Manager': '$70,000 - $120,000',
-        'Financial Advisor': '$55,000 - $95,000',
-        'Business Consultant': '$80,000 - $150,000',
-        'CEO/Executive': '$150,000 - $500,000+',
-        
-        # Science
-        'Research Scientist': '$65,000 - $110,000',
-        'Data Analyst': '$50,000 - $85,000',
-        'Lab Technician': '$35,000 - $55,000',
-        'Environmental Scientist': '$55,000 - $90,000',
-        
-        # Arts & Design
-        'UX/UI Designer': '$55,000 - $90,000',
-        'Graphic Design Assistant': '$30,000 - $45,000',
-        'Art Director': '$65,000 - $110,000',
-        'Creative Director': '$90,000 - $150,000',
-        
-        # Engineering
-        'Mechanical Engineer': '$70,000 - $115,000',
-        'Civil Engineer': '$65,000 - $105,000',
-        'Electrical Engineer': '$70,000 - $120,000',
-        'Engineering Technician': '$45,000 - $70,000',
-    }
-    return salary_ranges.get(career_title, '$40,000 - $80,000')
+    """Interest-based recommendations from the table-driven fallback engine"""
+    with span('inference'):
+        return fallback_engine.recommend(student_data)
 
 def save_recommendations(assessment, recommendations):
-    """Save recommendations to database"""
+    """Save recommendations to database with bulk queries in one transaction"""
     print(f"Saving {len(recommendations)} recommendations for assessment {assessment.id}")
 
-    for i, rec in enumerate(recommendations):
-        # Create or get Career object
-        career, created = Career.objects.get_or_create(
-            name=rec.get('career_name', 'Unknown Career'),
-            defaults={
-                'category': rec.get('category', 'General'),
-                'description': rec.get('description', rec.get('reasoning', 'No description provided'))
-            }
-        )
-
-        # Create the recommendation linked to the career
-        CareerRecommendation.objects.create(
-            assessment=assessment,
-            career=career,
-            confidence_score=rec.get('confidence_score', 0),
-            reasoning=rec.get('reasoning', 'No reasoning provided'),
-            rank=i + 1
-        )
+    with span('save'):
+        saved = save_recommendation_sets([(assessment, recommendations)])
 
-    print(f"Successfully saved {len(recommendations)} recommendations")
+    print(f"Successfully saved {saved} recommendations")
 
 def user_login(request):
     """User login view"""
@@ -817,11 +592,120 @@ def user_logout(request):
     messages.success(request, 'You have been logged out successfully.')
     return redirect('home')
 
+DASHBOARD_PAGE_SIZE = 25
+
+def _encode_cursor(assessment):
+    """Opaque keyset cursor for the row after which the next page starts"""
+    raw = f"{assessment.created_at.isoformat()}|{assessment.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    """Return (created_at, pk) from a cursor, or None if it is missing/invalid"""
+    if not cursor:
+        return None
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def _dashboard_queryset(request, user):
+    """
+    One keyset page of the user's assessments, newest first, each
+    annotated with its top-ranked career in the same query; returns
+    the unevaluated queryset (with one extra row) and the cursor
+    """
+    top_career = CareerRecommendation.objects.filter(
+        assessment=OuterRef('pk')
+    ).order_by('rank').values('career__name')[:1]
+    
+    queryset = (
+        StudentAssessment.objects.filter(user=user)
+        .defer('subject_scores', 'personality_traits', 'career_interests', 'recommendation_snapshot')
+        .annotate(top_career=Subquery(top_career))
+        .order_by('-created_at', '-id')
+    )
+    
+    cursor = _decode_cursor(request.GET.get('cursor'))
+    if cursor:
+        created_at, pk = cursor
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    
+    # Fetch one extra row to know whether another page exists
+    return queryset[:DASHBOARD_PAGE_SIZE + 1], cursor
+
+def _dashboard_result(assessments, cursor):
+    """(page, is_continuation, next_cursor) from the fetched rows"""
+    next_cursor = None
+    if len(assessments) > DASHBOARD_PAGE_SIZE:
+        assessments = assessments[:DASHBOARD_PAGE_SIZE]
+        next_cursor = _encode_cursor(assessments[-1])
+    
+    return assessments, cursor is not None, next_cursor
+
+def _dashboard_page(request):
+    queryset, cursor = _dashboard_queryset(request, request.user)
+    return _dashboard_result(list(queryset), cursor)
+
 @login_required
 def dashboard(request):
     """User dashboard showing their assessments"""
-    assessments = StudentAssessment.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, 'counselor/dashboard.html', {'assessments': assessments})
+    assessments, is_continuation, next_cursor = _dashboard_page(request)
+    context = {
+        'assessments': assessments,
+        'next_cursor': next_cursor,
+        'is_continuation': is_continuation,
+    }
+    if not is_continuation:
+        context['total_assessments'] = StudentAssessment.objects.filter(user=request.user).count()
+    with span('render'):
+        return render(request, 'counselor/dashboard.html', context)
+
+@async_login_required
+async def async_dashboard(request):
+    """Async variant of dashboard, served under ASGI"""
+    user = await aget_user(request)
+    queryset, cursor = _dashboard_queryset(request, user)
+    assessments, is_continuation, next_cursor = _dashboard_result(
+        [assessment async for assessment in queryset], cursor
+    )
+    context = {
+        'assessments': assessments,
+        'next_cursor': next_cursor,
+        'is_continuation': is_continuation,
+    }
+    if not is_continuation:
+        context['total_assessments'] = await StudentAssessment.objects.filter(user=user).acount()
+    with span('render'):
+        return await sync_to_async(render)(request, 'counselor/dashboard.html', context)
+
+@login_required
+def api_dashboard(request):
+    """JSON variant of the dashboard for infinite scroll"""
+    assessments, _, next_cursor = _dashboard_page(request)
+    return JsonResponse({
+        'assessments': [
+            {
+                'session_id': assessment.session_id,
+                'name': assessment.name,
+                'age': assessment.age,
+                'education_level': assessment.education_level,
+                'created_at': assessment.created_at.isoformat(),
+                'top_career': assessment.top_career,
+                'results_url': reverse('results', args=[assessment.session_id]),
+            }
+            for assessment in assessments
+        ],
+        'next_cursor': next_cursor,
+    })
+
+@staff_member_required
+def api_timings(request):
+    """Per-phase latency histograms of this worker process"""
+    response = JsonResponse({'phases': timing.snapshot()})
+    patch_cache_control(response, no_cache=True, no_store=True)
+    return response
+
 def assessment_view(request):
     """Alias for the main assessment function"""
     return assessment(request)